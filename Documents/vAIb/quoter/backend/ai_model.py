@@ -1,7 +1,10 @@
 import json
-from typing import Dict, List, Tuple
+from itertools import repeat
+import numpy as np
+from typing import Dict, Iterable, List, Tuple
 import os
 from config import settings
+from training_store import TrainingDataStore
 
 class PricingModel:
     def __init__(self):
@@ -35,44 +38,175 @@ class PricingModel:
             'expert': 2.0
         }
         
+        self.compile_pricing_table()
         self.load_training_data()
     
     def load_training_data(self):
-        """Load training data if exists"""
-        self.training_data = []
-        if os.path.exists(settings.DATA_PATH + '/training_data.json'):
-            try:
-                with open(settings.DATA_PATH + '/training_data.json', 'r') as f:
-                    self.training_data = json.load(f)
-                print(f"Loaded {len(self.training_data)} training examples")
-            except:
-                print("Failed to load training data")
+        """Open the training data log and load price aggregates"""
+        self.price_stats = {}
+        self.training_store = TrainingDataStore(
+            os.path.join(settings.DATA_PATH, 'training_log'),
+            segment_bytes=settings.TRAINING_SEGMENT_BYTES,
+            fsync_every=settings.TRAINING_FSYNC_EVERY,
+            fsync_interval=settings.TRAINING_FSYNC_INTERVAL,
+            compact_segments=settings.TRAINING_COMPACT_SEGMENTS
+        )
+        self._migrate_legacy_training_data()
+        
+        if self.training_store.count:
+            print(f"Loaded {self.training_store.count} training examples")
         else:
             print("No training data found")
+            return
+        
+        if not self.load_price_stats():
+            # Aggregates missing or out of step with the samples, rebuild once
+            self._update_price_stats(self.training_store.iter_samples())
+            self.save_price_stats()
+            print(f"Rebuilt price aggregates from {self.training_store.count} training examples")
+        self._update_base_prices()
+    
+    def _migrate_legacy_training_data(self):
+        """Move a training_data.json written by older versions into the log"""
+        legacy_path = settings.DATA_PATH + '/training_data.json'
+        if not os.path.exists(legacy_path) or self.training_store.count:
+            return
+        try:
+            with open(legacy_path, 'r') as f:
+                legacy_data = json.load(f)
+        except:
+            print("Failed to load legacy training data")
+            return
+        
+        self.training_store.append(legacy_data)
+        self.training_store.sync()
+        os.replace(legacy_path, legacy_path + '.migrated')
+        print(f"Migrated {len(legacy_data)} training examples to the training log")
+    
+    def load_price_stats(self) -> bool:
+        """Load persisted per-(industry, experience_level) aggregates
+        
+        Returns False when the file is missing, unreadable or was written for a
+        different number of samples than the training data holds.
+        """
+        if not os.path.exists(settings.DATA_PATH + '/price_stats.json'):
+            return False
+        try:
+            with open(settings.DATA_PATH + '/price_stats.json', 'r') as f:
+                stats_data = json.load(f)
+        except:
+            print("Failed to load price aggregates")
+            return False
+        
+        if stats_data.get('samples') != self.training_store.count:
+            return False
+        
+        self.price_stats = {
+            (entry['industry'], entry['experience_level']): {
+                'count': entry['count'],
+                'sum': entry['sum'],
+                'mean': entry['mean'],
+                'm2': entry['m2']
+            }
+            for entry in stats_data.get('stats', [])
+        }
+        return True
     
-    def save_training_data(self):
-        """Save training data"""
+    def save_price_stats(self):
+        """Save per-(industry, experience_level) aggregates"""
         os.makedirs(settings.DATA_PATH, exist_ok=True)
-        with open(settings.DATA_PATH + '/training_data.json', 'w') as f:
-            json.dump(self.training_data, f, indent=2)
+        stats_data = {
+            'samples': self.training_store.count,
+            'stats': [
+                {'industry': industry, 'experience_level': exp_level, **stats}
+                for (industry, exp_level), stats in self.price_stats.items()
+            ]
+        }
+        with open(settings.DATA_PATH + '/price_stats.json', 'w') as f:
+            json.dump(stats_data, f)
+    
+    def compile_pricing_table(self):
+        """Intern pricing labels into integer codes and precompute hourly rates
+        
+        pricing_table[industry, experience_level, location, complexity] holds
+        base_price * location_mult * complexity_mult. The last slot on every
+        axis is the default used for unknown labels.
+        """
+        experience_levels = []
+        for levels in self.base_prices.values():
+            for level in levels:
+                if level not in experience_levels:
+                    experience_levels.append(level)
+        
+        self.industry_codes = {name: code for code, name in enumerate(self.base_prices)}
+        self.experience_codes = {name: code for code, name in enumerate(experience_levels)}
+        self.location_codes = {name: code for code, name in enumerate(self.location_multipliers)}
+        self.complexity_codes = {name: code for code, name in enumerate(self.complexity_multipliers)}
+        
+        base = np.full((len(self.industry_codes) + 1, len(self.experience_codes) + 1), 200.0)
+        for industry, levels in self.base_prices.items():
+            for level, price in levels.items():
+                base[self.industry_codes[industry], self.experience_codes[level]] = price
+        location_mult = np.append(np.array(list(self.location_multipliers.values()), dtype=float), 1.0)
+        complexity_mult = np.append(np.array(list(self.complexity_multipliers.values()), dtype=float), 1.0)
+        
+        self.pricing_table = (base[:, :, None, None]
+                              * location_mult[None, None, :, None]
+                              * complexity_mult[None, None, None, :])
+    
+    def _location_code(self, location: str) -> int:
+        """Location code, only lower-casing labels that miss the exact lookup"""
+        code = self.location_codes.get(location)
+        if code is None:
+            code = self.location_codes.get(location.lower(), len(self.location_codes))
+        return code
+    
+    def hourly_rate(self, industry: str, location: str, experience_level: str, complexity: str) -> float:
+        """Precomputed hourly rate from the compiled pricing table"""
+        return self.pricing_table.item(
+            self.industry_codes.get(industry, len(self.industry_codes)),
+            self.experience_codes.get(experience_level, len(self.experience_codes)),
+            self._location_code(location),
+            self.complexity_codes.get(complexity, len(self.complexity_codes))
+        )
+    
+    def hourly_rates(self, industries: List[str], locations: List[str],
+                     experience_levels: List[str], complexities: List[str]) -> np.ndarray:
+        """Precomputed hourly rates for a batch, one gather from the pricing table"""
+        n_rows = len(industries)
+        industry_idx = np.fromiter(
+            map(self.industry_codes.get, industries, repeat(len(self.industry_codes))), dtype=np.intp, count=n_rows)
+        experience_idx = np.fromiter(
+            map(self.experience_codes.get, experience_levels, repeat(len(self.experience_codes))), dtype=np.intp, count=n_rows)
+        complexity_idx = np.fromiter(
+            map(self.complexity_codes.get, complexities, repeat(len(self.complexity_codes))), dtype=np.intp, count=n_rows)
+        location_idx = np.fromiter(map(self.location_codes.get, locations, repeat(-1)), dtype=np.intp, count=n_rows)
+        for i in np.flatnonzero(location_idx < 0):
+            location_idx[i] = self._location_code(locations[i])
+        
+        return self.pricing_table[industry_idx, experience_idx, location_idx, complexity_idx]
     
     def rule_based_pricing(self, industry: str, location: str, experience_level: str, 
                           complexity: str, duration_hours: float) -> Tuple[float, float]:
         """Rule-based pricing with market data integration"""
-        base_price = self.base_prices.get(industry, {}).get(experience_level, 200)
-        location_mult = self.location_multipliers.get(location.lower(), 1.0)
-        complexity_mult = self.complexity_multipliers.get(complexity, 1.0)
-        
-        # Calculate base price
-        adjusted_price = base_price * location_mult * complexity_mult * duration_hours
+        adjusted_price = self.hourly_rate(industry, location, experience_level, complexity) * duration_hours
         
         # Add confidence interval based on data availability
-        confidence_range = 0.2 if self.training_data else 0.3
+        confidence_range = 0.2 if self.training_store.count else 0.3
         min_price = adjusted_price * (1 - confidence_range)
         max_price = adjusted_price * (1 + confidence_range)
         
         return min_price, max_price
     
+    def rule_based_pricing_many(self, industries: List[str], locations: List[str],
+                                experience_levels: List[str], complexities: List[str],
+                                durations: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Vectorized rule-based pricing for a batch of quotes"""
+        adjusted = self.hourly_rates(industries, locations, experience_levels, complexities) * durations
+        
+        confidence_range = 0.2 if self.training_store.count else 0.3
+        return adjusted * (1 - confidence_range), adjusted * (1 + confidence_range)
+    
     def predict_price(self, features: Dict) -> Dict:
         """Predict pricing recommendation"""
         industry = features.get('industry', 'graphic_design')
@@ -87,7 +221,7 @@ class PricingModel:
         )
         
         # Calculate confidence based on available data
-        confidence = min(0.9, 0.7 + (len(self.training_data) * 0.01))
+        confidence = min(0.9, 0.7 + (self.training_store.count * 0.01))
         
         return {
             'min_price': round(min_price, 2),
@@ -96,49 +230,105 @@ class PricingModel:
             'rationale': f"Based on {experience_level} level {industry} work in {location} with {complexity} complexity"
         }
     
+    def predict_many(self, features_list: List[Dict]) -> List[Dict]:
+        """Predict pricing recommendations for a batch of quotes in one pass"""
+        if not features_list:
+            return []
+        
+        industries = [f.get('industry', 'graphic_design') for f in features_list]
+        locations = [f.get('location', 'gauteng') for f in features_list]
+        experience_levels = [f.get('experience_level', 'mid') for f in features_list]
+        complexities = [f.get('complexity', 'standard') for f in features_list]
+        durations = np.array([f.get('duration_hours', 8.0) for f in features_list], dtype=float)
+        
+        min_prices, max_prices = self.rule_based_pricing_many(
+            industries, locations, experience_levels, complexities, durations
+        )
+        min_prices = np.round(min_prices, 2)
+        max_prices = np.round(max_prices, 2)
+        confidence = round(min(0.9, 0.7 + (self.training_store.count * 0.01)), 2)
+        
+        return [
+            {
+                'min_price': float(min_prices[i]),
+                'max_price': float(max_prices[i]),
+                'confidence': confidence,
+                'rationale': f"Based on {experience_levels[i]} level {industries[i]} work in {locations[i]} with {complexities[i]} complexity"
+            }
+            for i in range(len(features_list))
+        ]
+    
     def train_model(self, training_data: List[Dict]):
         """Add new training data to improve pricing accuracy"""
         if not training_data:
             return
         
-        # Add new data to training set
-        for item in training_data:
-            self.training_data.append(item)
+        # Append new data to the training log
+        self.training_store.append(training_data)
         
-        # Save updated training data
-        self.save_training_data()
+        # Fold the new samples into the running averages and only refresh
+        # the base prices they touched
+        changed_keys = self._update_price_stats(training_data)
+        self.save_price_stats()
+        self._update_base_prices(changed_keys)
         
-        # Update base prices based on new data (simple averaging)
-        self._update_base_prices()
-        
-        print(f"Added {len(training_data)} new training examples. Total: {len(self.training_data)}")
+        print(f"Added {len(training_data)} new training examples. Total: {self.training_store.count}")
     
-    def _update_base_prices(self):
-        """Update base prices based on training data"""
-        if not self.training_data:
-            return
+    def _update_price_stats(self, samples: Iterable[Dict]) -> set:
+        """Fold samples into the running hourly-rate aggregates, O(1) per sample
         
-        # Group by industry and experience level
-        price_data = {}
-        for item in self.training_data:
-            industry = item.get('industry', 'graphic_design')
-            exp_level = item.get('experience_level', 'mid')
+        Keeps count, sum and a Welford mean/M2 per (industry, experience_level)
+        and returns the keys that changed.
+        """
+        changed_keys = set()
+        for item in samples:
             price = item.get('final_price', 0)
             duration = item.get('duration_hours', 8.0)
+            if duration <= 0:
+                continue
             
-            if duration > 0:
-                hourly_rate = price / duration
-                key = (industry, exp_level)
-                if key not in price_data:
-                    price_data[key] = []
-                price_data[key].append(hourly_rate)
-        
-        # Update base prices with averages
-        for (industry, exp_level), rates in price_data.items():
-            if len(rates) >= 3:  # Only update if we have enough data
-                avg_rate = sum(rates) / len(rates)
+            hourly_rate = price / duration
+            key = (item.get('industry', 'graphic_design'), item.get('experience_level', 'mid'))
+            stats = self.price_stats.get(key)
+            if stats is None:
+                stats = self.price_stats[key] = {'count': 0, 'sum': 0.0, 'mean': 0.0, 'm2': 0.0}
+            
+            stats['count'] += 1
+            stats['sum'] += hourly_rate
+            delta = hourly_rate - stats['mean']
+            stats['mean'] += delta / stats['count']
+            stats['m2'] += delta * (hourly_rate - stats['mean'])
+            changed_keys.add(key)
+        
+        return changed_keys
+    
+    def price_variance(self, industry: str, experience_level: str) -> float:
+        """Sample variance of observed hourly rates, 0.0 with fewer than two samples"""
+        stats = self.price_stats.get((industry, experience_level))
+        if not stats or stats['count'] < 2:
+            return 0.0
+        return stats['m2'] / (stats['count'] - 1)
+    
+    def _update_base_prices(self, keys=None):
+        """Update base prices from the running aggregates
+        
+        Only the given (industry, experience_level) keys are refreshed, or
+        every aggregated key when keys is None.
+        """
+        if keys is None:
+            keys = self.price_stats.keys()
+        
+        updated = False
+        for industry, exp_level in keys:
+            stats = self.price_stats[(industry, exp_level)]
+            if stats['count'] >= 3:  # Only update if we have enough data
+                avg_rate = stats['sum'] / stats['count']
                 if industry in self.base_prices:
                     self.base_prices[industry][exp_level] = round(avg_rate, 2)
+                    updated = True
+        
+        if updated:
+            self.compile_pricing_table()
 
 # Global model instance
 pricing_model = PricingModel() 
\ No newline at end of file
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark training data ingest and cold start: append-only log vs training_data.json
+
+Run from the backend directory: python benchmarks/bench_training_store.py [sizes...]
+"""
+
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import settings
+
+INGEST_BATCH = 1000
+
+def make_samples(n: int, seed: int = 0):
+    rng = random.Random(seed)
+    industries = ['graphic_design', 'web_development', 'copywriting', 'plumbing', 'consulting']
+    return [
+        {
+            'industry': rng.choice(industries),
+            'location': 'gauteng',
+            'experience_level': rng.choice(['junior', 'mid', 'senior']),
+            'complexity': 'standard',
+            'duration_hours': rng.choice([2.0, 8.0, 16.0, 40.0]),
+            'final_price': round(rng.uniform(500, 50000), 2),
+        }
+        for _ in range(n)
+    ]
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+def bench_legacy(samples, data_dir: str):
+    """The previous persistence: rewrite the whole JSON file per ingest, json.load at startup"""
+    path = os.path.join(data_dir, 'training_data.json')
+
+    def save():
+        with open(path, 'w') as f:
+            json.dump(samples, f, indent=2)
+
+    def load():
+        with open(path, 'r') as f:
+            return json.load(f)
+
+    ingest, _ = timed(save)
+    cold_start, _ = timed(load)
+    return ingest, cold_start
+
+def bench_log(samples, data_dir: str):
+    settings.DATA_PATH = data_dir
+    import ai_model
+
+    model = ai_model.PricingModel()
+    total, _ = timed(lambda: [model.train_model(samples[i:i + INGEST_BATCH])
+                              for i in range(0, len(samples), INGEST_BATCH)])
+    last_ingest, _ = timed(lambda: model.train_model(samples[:INGEST_BATCH]))
+    model.training_store.close()
+
+    cold_start, _ = timed(ai_model.PricingModel)
+    os.remove(os.path.join(data_dir, 'price_stats.json'))
+    rebuild, _ = timed(ai_model.PricingModel)
+    return total, last_ingest, cold_start, rebuild
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [100_000, 1_000_000]
+    devnull = open(os.devnull, 'w')
+
+    for n in sizes:
+        samples = make_samples(n)
+        legacy_dir = tempfile.mkdtemp()
+        log_dir = tempfile.mkdtemp()
+        try:
+            legacy_ingest, legacy_cold = bench_legacy(samples, legacy_dir)
+            stdout, sys.stdout = sys.stdout, devnull
+            try:
+                total, last_ingest, cold_start, rebuild = bench_log(samples, log_dir)
+            finally:
+                sys.stdout = stdout
+        finally:
+            shutil.rmtree(legacy_dir)
+            shutil.rmtree(log_dir)
+
+        print(f"\n{n:,} samples")
+        print(f"  training_data.json  ingest of {INGEST_BATCH} at this size: {legacy_ingest * 1000:9.1f} ms"
+              f"   cold start: {legacy_cold * 1000:9.1f} ms")
+        print(f"  append-only log     ingest of {INGEST_BATCH} at this size: {last_ingest * 1000:9.1f} ms"
+              f"   cold start: {cold_start * 1000:9.1f} ms (aggregates), {rebuild * 1000:.1f} ms (stream rebuild)")
+        print(f"  append-only log     total ingest of {n:,}: {total:.1f} s")
+
+if __name__ == "__main__":
+    main()
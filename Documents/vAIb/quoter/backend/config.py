@@ -13,6 +13,10 @@ class Settings:
     # AI Model Configuration
     MODEL_PATH: str = os.getenv("MODEL_PATH", "./models/pricing_model.pkl")
     DATA_PATH: str = os.getenv("DATA_PATH", "./data/")
+    TRAINING_SEGMENT_BYTES: int = int(os.getenv("TRAINING_SEGMENT_BYTES", "67108864"))
+    TRAINING_FSYNC_EVERY: int = int(os.getenv("TRAINING_FSYNC_EVERY", "1000"))
+    TRAINING_FSYNC_INTERVAL: float = float(os.getenv("TRAINING_FSYNC_INTERVAL", "5.0"))
+    TRAINING_COMPACT_SEGMENTS: int = int(os.getenv("TRAINING_COMPACT_SEGMENTS", "8"))
     
     # External APIs
     PAYSTACK_SECRET_KEY: str = os.getenv("PAYSTACK_SECRET_KEY", "")
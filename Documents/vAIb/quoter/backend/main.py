@@ -30,6 +30,11 @@ app.add_middleware(
 
 security = HTTPBearer()
 
+@app.on_event("shutdown")
+def close_training_store():
+    # fsync the last batch of training samples
+    pricing_model.training_store.close()
+
 # Dependency to get current user
 def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)):
     email = get_current_user_email(credentials.credentials)
@@ -99,6 +104,18 @@ async def predict_pricing(features: QuoteFeatures, current_user: User = Depends(
     prediction = pricing_model.predict_price(features.dict())
     return PricingRecommendation(**prediction)
 
+@app.post("/ai/predict/batch", response_model=List[PricingRecommendation])
+async def predict_pricing_batch(features_list: List[QuoteFeatures], current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+    # Check subscription limits for free tier
+    if current_user.subscription_tier == "free":
+        quote_count = db.query(DBQuote).filter(DBQuote.user_id == current_user.id).count()
+        if quote_count >= 2:
+            raise HTTPException(status_code=403, detail="Free tier limit reached. Upgrade to Pro for unlimited quotes.")
+
+    # Score all rows in one vectorized pass
+    predictions = pricing_model.predict_many([features.dict() for features in features_list])
+    return [PricingRecommendation(**prediction) for prediction in predictions]
+
 @app.get("/ai/industries")
 async def get_industries():
     return {
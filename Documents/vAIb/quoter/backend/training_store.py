@@ -0,0 +1,224 @@
+import json
+import os
+import re
+import shutil
+import threading
+import time
+from typing import Dict, Iterator, List
+
+SEGMENT_PATTERN = re.compile(r'^(\d{12})\.jsonl$')
+
+class TrainingDataStore:
+    """Append-only, segmented JSON Lines log of training samples
+
+    Each segment is named after the index of its first sample. New samples go to
+    the newest segment, which rolls over once it reaches segment_bytes. fsync is
+    batched: it runs every fsync_every samples or fsync_interval seconds, whichever
+    comes first, with a timer covering the interval when no further append
+    arrives, and once more on close(). Closed segments are merged by compact(), which is crash safe
+    because a merged segment keeps the name of the first segment it replaces and
+    any leftover segments it covers are dropped on the next open.
+    """
+
+    def __init__(self, directory: str, segment_bytes: int = 64 * 1024 * 1024, fsync_every: int = 1000,
+                 fsync_interval: float = 5.0, compact_segments: int = 8):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.compact_segments = compact_segments
+
+        self._file = None
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        # The timer syncs from its own thread, so file access is serialised
+        self._lock = threading.RLock()
+        self._sync_timer = None
+
+        os.makedirs(self.directory, exist_ok=True)
+        self._segments = self._scan_segments()
+        self.count = sum(segment['count'] for segment in self._segments)
+
+    def _segment_path(self, start: int) -> str:
+        return os.path.join(self.directory, f"{start:012d}.jsonl")
+
+    def _scan_segments(self) -> List[Dict]:
+        """Find live segments, dropping ones already covered by a merged segment"""
+        starts = []
+        for name in os.listdir(self.directory):
+            match = SEGMENT_PATTERN.match(name)
+            if match:
+                starts.append(int(match.group(1)))
+            elif name.endswith('.tmp'):
+                os.remove(os.path.join(self.directory, name))
+
+        segments = []
+        next_start = 0
+        for start in sorted(starts):
+            path = self._segment_path(start)
+            if start < next_start:
+                # Left behind by an interrupted compaction
+                os.remove(path)
+                continue
+            count = self._count_lines(path)
+            segments.append({'start': start, 'path': path, 'count': count})
+            next_start = start + count
+
+        if segments:
+            self._repair_tail(segments[-1])
+        return segments
+
+    @staticmethod
+    def _count_lines(path: str) -> int:
+        count = 0
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                count += chunk.count(b'\n')
+        return count
+
+    @staticmethod
+    def _repair_tail(segment: Dict):
+        """Truncate a partially written last record left by a crash"""
+        with open(segment['path'], 'rb+') as f:
+            size = f.seek(0, os.SEEK_END)
+            if size == 0:
+                return
+            f.seek(size - 1)
+            if f.read(1) == b'\n':
+                return
+            # Walk back to the end of the last complete record
+            position = size
+            while position > 0:
+                step = min(64 * 1024, position)
+                f.seek(position - step)
+                block = f.read(step)
+                newline = block.rfind(b'\n')
+                if newline != -1:
+                    f.truncate(position - step + newline + 1)
+                    return
+                position -= step
+            f.truncate(0)
+
+    def _active_file(self):
+        if self._file is None:
+            if not self._segments:
+                self._segments.append({'start': self.count, 'path': self._segment_path(self.count), 'count': 0})
+            self._file = open(self._segments[-1]['path'], 'a', encoding='utf-8')
+        return self._file
+
+    def append(self, samples: List[Dict]):
+        """Append samples to the log"""
+        if not samples:
+            return
+
+        with self._lock:
+            f = self._active_file()
+            f.write(''.join(json.dumps(sample) + '\n' for sample in samples))
+            f.flush()
+
+            self._segments[-1]['count'] += len(samples)
+            self.count += len(samples)
+            self._unsynced += len(samples)
+
+            if self._unsynced >= self.fsync_every or time.monotonic() - self._last_sync >= self.fsync_interval:
+                self.sync()
+            if f.tell() >= self.segment_bytes:
+                self._roll()
+            if self._unsynced and self._sync_timer is None:
+                self._schedule_sync()
+
+    def _schedule_sync(self):
+        """Sync the batch fsync_interval seconds from now, in case no append comes to do it"""
+        self._sync_timer = threading.Timer(self.fsync_interval, self._timed_sync)
+        self._sync_timer.daemon = True
+        self._sync_timer.start()
+
+    def _timed_sync(self):
+        with self._lock:
+            self._sync_timer = None
+            self.sync()
+
+    def sync(self):
+        """fsync samples written since the last sync"""
+        with self._lock:
+            if self._file is not None and self._unsynced:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+            self._unsynced = 0
+            self._last_sync = time.monotonic()
+
+    def close(self):
+        with self._lock:
+            if self._sync_timer is not None:
+                self._sync_timer.cancel()
+                self._sync_timer = None
+            self.sync()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _roll(self):
+        """Close the active segment and start a new one"""
+        self.close()
+        self._segments.append({'start': self.count, 'path': self._segment_path(self.count), 'count': 0})
+        self._file = open(self._segments[-1]['path'], 'a', encoding='utf-8')
+        if len(self._compaction_run()) > self.compact_segments:
+            self.compact()
+
+    def _compaction_run(self) -> List[Dict]:
+        """Closed segments after the last one that is already fully merged"""
+        closed = self._segments[:-1]
+        merged_limit = self.segment_bytes * self.compact_segments
+        first = 0
+        for i, segment in enumerate(closed):
+            if os.path.getsize(segment['path']) >= merged_limit:
+                first = i + 1
+        return closed[first:]
+
+    def compact(self):
+        """Merge the run of small closed segments into one
+
+        Segments that already reached segment_bytes * compact_segments are left
+        alone, so old history is not rewritten on every compaction.
+        """
+        run = self._compaction_run()
+        if len(run) < 2:
+            return
+
+        target = run[0]['path']
+        tmp_path = target + '.tmp'
+        with open(tmp_path, 'wb') as out:
+            for segment in run:
+                with open(segment['path'], 'rb') as f:
+                    shutil.copyfileobj(f, out)
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(tmp_path, target)
+        self._sync_directory()
+
+        for segment in run[1:]:
+            os.remove(segment['path'])
+
+        first = self._segments.index(run[0])
+        merged = {'start': run[0]['start'], 'path': target, 'count': sum(s['count'] for s in run)}
+        self._segments[first:first + len(run)] = [merged]
+
+    def _sync_directory(self):
+        if hasattr(os, 'O_DIRECTORY'):
+            fd = os.open(self.directory, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    def iter_samples(self) -> Iterator[Dict]:
+        """Stream samples in insertion order without loading the whole log"""
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+            segments = list(self._segments)
+        for segment in segments:
+            with open(segment['path'], 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
@@ -1,17 +1,25 @@
-import pandas as pd
 import numpy as np
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.preprocessing import LabelEncoder
 import pickle
 import json
-from typing import Dict, List, Tuple
+import copy
+from itertools import repeat
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 import os
 from config import settings
+from forest_artifact import ForestArtifact
+
+# pandas and scikit-learn are only needed to fit models, so they are imported
+# inside the training functions rather than on every worker start
+if TYPE_CHECKING:
+    from sklearn.ensemble import RandomForestRegressor
 
 class PricingModel:
+    FEATURE_COLUMNS = ['industry', 'location', 'experience_level', 'complexity', 'duration_hours']
+    
     def __init__(self):
-        self.model = None
-        self.label_encoders = {}
+        # The fitted forest and its label encoders are swapped together as one
+        # tuple so a prediction never pairs a model with another fit's encoders
+        self._fitted = (None, {})
         self.base_prices = {
             'graphic_design': {'junior': 150, 'mid': 250, 'senior': 400},
             'web_development': {'junior': 200, 'mid': 350, 'senior': 600},
@@ -42,41 +50,143 @@ class PricingModel:
             'expert': 2.0
         }
         
+        self.compile_pricing_table()
         self.load_model()
     
+    @property
+    def fitted(self) -> Tuple:
+        """The (model, label_encoders) pair, read together"""
+        return self._fitted
+    
+    @property
+    def model(self):
+        return self._fitted[0]
+    
+    @property
+    def label_encoders(self) -> Dict:
+        return self._fitted[1]
+    
+    def swap_model(self, model, label_encoders: Dict):
+        """Atomically replace the fitted model and its encoders"""
+        self._fitted = (model, label_encoders)
+    
     def load_model(self):
-        """Load trained model if exists"""
+        """Load trained model if exists
+        
+        The flat forest artifact is preferred: it is memory-mapped, so workers
+        share one page-cache copy instead of each unpickling the full forest.
+        """
+        if os.path.exists(settings.MODEL_ARTIFACT_PATH):
+            try:
+                artifact = ForestArtifact.load(settings.MODEL_ARTIFACT_PATH)
+                self.swap_model(artifact, artifact.label_encoders)
+                print("Loaded existing model")
+                return
+            except:
+                print("Failed to load model artifact, trying pickled model")
+        
         if os.path.exists(settings.MODEL_PATH):
             try:
-                with open(settings.MODEL_PATH, 'rb') as f:
-                    model_data = pickle.load(f)
-                    self.model = model_data['model']
-                    self.label_encoders = model_data['encoders']
+                model, label_encoders = load_pickled_model()
+                self.swap_model(model, label_encoders)
                 print("Loaded existing model")
             except:
                 print("Failed to load model, using rule-based fallback")
+                return
+            try:
+                # Models saved before the artifact format existed get one exported
+                ForestArtifact.export(model, label_encoders, settings.MODEL_ARTIFACT_PATH)
+            except:
+                print("Failed to export model artifact")
         else:
             print("No existing model found, using rule-based pricing")
     
     def save_model(self):
-        """Save trained model"""
+        """Save trained model
+        
+        The pickle keeps the full sklearn forest for warm-start retraining; the
+        flat artifact is what workers load for inference.
+        """
         os.makedirs(os.path.dirname(settings.MODEL_PATH), exist_ok=True)
+        model, label_encoders = self._fitted
         model_data = {
-            'model': self.model,
-            'encoders': self.label_encoders
+            'model': model,
+            'encoders': label_encoders
         }
-        with open(settings.MODEL_PATH, 'wb') as f:
+        # Write to a temporary file first so a booting worker never reads a partial pickle
+        tmp_path = settings.MODEL_PATH + '.tmp'
+        with open(tmp_path, 'wb') as f:
             pickle.dump(model_data, f)
+        os.replace(tmp_path, settings.MODEL_PATH)
+        
+        os.makedirs(os.path.dirname(settings.MODEL_ARTIFACT_PATH), exist_ok=True)
+        ForestArtifact.export(model, label_encoders, settings.MODEL_ARTIFACT_PATH)
+    
+    def compile_pricing_table(self):
+        """Intern pricing labels into integer codes and precompute hourly rates
+        
+        pricing_table[industry, experience_level, location, complexity] holds
+        base_price * location_mult * complexity_mult. The last slot on every
+        axis is the default used for unknown labels.
+        """
+        experience_levels = []
+        for levels in self.base_prices.values():
+            for level in levels:
+                if level not in experience_levels:
+                    experience_levels.append(level)
+        
+        self.industry_codes = {name: code for code, name in enumerate(self.base_prices)}
+        self.experience_codes = {name: code for code, name in enumerate(experience_levels)}
+        self.location_codes = {name: code for code, name in enumerate(self.location_multipliers)}
+        self.complexity_codes = {name: code for code, name in enumerate(self.complexity_multipliers)}
+        
+        base = np.full((len(self.industry_codes) + 1, len(self.experience_codes) + 1), 200.0)
+        for industry, levels in self.base_prices.items():
+            for level, price in levels.items():
+                base[self.industry_codes[industry], self.experience_codes[level]] = price
+        location_mult = np.append(np.array(list(self.location_multipliers.values()), dtype=float), 1.0)
+        complexity_mult = np.append(np.array(list(self.complexity_multipliers.values()), dtype=float), 1.0)
+        
+        self.pricing_table = (base[:, :, None, None]
+                              * location_mult[None, None, :, None]
+                              * complexity_mult[None, None, None, :])
+    
+    def _location_code(self, location: str) -> int:
+        """Location code, only lower-casing labels that miss the exact lookup"""
+        code = self.location_codes.get(location)
+        if code is None:
+            code = self.location_codes.get(location.lower(), len(self.location_codes))
+        return code
+    
+    def hourly_rate(self, industry: str, location: str, experience_level: str, complexity: str) -> float:
+        """Precomputed hourly rate from the compiled pricing table"""
+        return self.pricing_table.item(
+            self.industry_codes.get(industry, len(self.industry_codes)),
+            self.experience_codes.get(experience_level, len(self.experience_codes)),
+            self._location_code(location),
+            self.complexity_codes.get(complexity, len(self.complexity_codes))
+        )
+    
+    def hourly_rates(self, industries: List[str], locations: List[str],
+                     experience_levels: List[str], complexities: List[str]) -> np.ndarray:
+        """Precomputed hourly rates for a batch, one gather from the pricing table"""
+        n_rows = len(industries)
+        industry_idx = np.fromiter(
+            map(self.industry_codes.get, industries, repeat(len(self.industry_codes))), dtype=np.intp, count=n_rows)
+        experience_idx = np.fromiter(
+            map(self.experience_codes.get, experience_levels, repeat(len(self.experience_codes))), dtype=np.intp, count=n_rows)
+        complexity_idx = np.fromiter(
+            map(self.complexity_codes.get, complexities, repeat(len(self.complexity_codes))), dtype=np.intp, count=n_rows)
+        location_idx = np.fromiter(map(self.location_codes.get, locations, repeat(-1)), dtype=np.intp, count=n_rows)
+        for i in np.flatnonzero(location_idx < 0):
+            location_idx[i] = self._location_code(locations[i])
+        
+        return self.pricing_table[industry_idx, experience_idx, location_idx, complexity_idx]
     
     def rule_based_pricing(self, industry: str, location: str, experience_level: str, 
                           complexity: str, duration_hours: float) -> Tuple[float, float]:
         """Rule-based pricing as fallback"""
-        base_price = self.base_prices.get(industry, {}).get(experience_level, 200)
-        location_mult = self.location_multipliers.get(location.lower(), 1.0)
-        complexity_mult = self.complexity_multipliers.get(complexity, 1.0)
-        
-        # Calculate base price
-        adjusted_price = base_price * location_mult * complexity_mult * duration_hours
+        adjusted_price = self.hourly_rate(industry, location, experience_level, complexity) * duration_hours
         
         # Add confidence interval
         min_price = adjusted_price * 0.8
@@ -86,92 +196,171 @@ class PricingModel:
     
     def predict_price(self, features: Dict) -> Dict:
         """Predict pricing recommendation"""
-        industry = features.get('industry', 'graphic_design')
-        location = features.get('location', 'gauteng')
-        experience_level = features.get('experience_level', 'mid')
-        complexity = features.get('complexity', 'standard')
-        duration_hours = features.get('duration_hours', 8.0)
-        
-        # Use ML model if available, otherwise rule-based
-        if self.model is not None:
+        # A batch of one, so a single quote is encoded from FEATURE_COLUMNS exactly as a batch is
+        return self.predict_many([features])[0]
+    
+    def rule_based_pricing_many(self, industries: List[str], locations: List[str],
+                                experience_levels: List[str], complexities: List[str],
+                                durations: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Vectorized rule-based pricing for a batch of quotes"""
+        adjusted = self.hourly_rates(industries, locations, experience_levels, complexities) * durations
+        return adjusted * 0.8, adjusted * 1.2
+    
+    def predict_many(self, features_list: List[Dict]) -> List[Dict]:
+        """Predict pricing recommendations for a batch of quotes in one pass"""
+        if not features_list:
+            return []
+        
+        industries = [f.get('industry', 'graphic_design') for f in features_list]
+        locations = [f.get('location', 'gauteng') for f in features_list]
+        experience_levels = [f.get('experience_level', 'mid') for f in features_list]
+        complexities = [f.get('complexity', 'standard') for f in features_list]
+        durations = np.array([f.get('duration_hours', 8.0) for f in features_list], dtype=float)
+        
+        rule_min_prices, rule_max_prices = self.rule_based_pricing_many(
+            industries, locations, experience_levels, complexities, durations
+        )
+        min_prices, max_prices = rule_min_prices.copy(), rule_max_prices.copy()
+        confidences = np.full(len(features_list), 0.7)
+        
+        # Rows with labels the encoders have seen go through a single model call,
+        # the rest keep the rule-based fallback
+        model, label_encoders = self._fitted
+        if model is not None:
             try:
-                # Prepare features for ML model
-                encoded_features = self._encode_features(features)
-                prediction = self.model.predict([encoded_features])[0]
-                
-                # Calculate confidence interval
-                min_price = prediction * 0.85
-                max_price = prediction * 1.15
-                
-                confidence = 0.85
-            except:
-                min_price, max_price = self.rule_based_pricing(
-                    industry, location, experience_level, complexity, duration_hours
-                )
-                confidence = 0.7
-        else:
-            min_price, max_price = self.rule_based_pricing(
-                industry, location, experience_level, complexity, duration_hours
-            )
-            confidence = 0.7
-        
-        return {
-            'min_price': round(min_price, 2),
-            'max_price': round(max_price, 2),
-            'confidence': confidence,
-            'rationale': f"Based on {experience_level} level {industry} work in {location} with {complexity} complexity"
-        }
+                X, known = self._encode_matrix({
+                    'industry': industries,
+                    'location': locations,
+                    'experience_level': experience_levels,
+                    'complexity': complexities,
+                }, durations, label_encoders)
+                if known.any():
+                    predictions = model.predict(X[known])
+                    min_prices[known] = predictions * 0.85
+                    max_prices[known] = predictions * 1.15
+                    confidences[known] = 0.85
+            except Exception as e:
+                print(f"Model prediction failed, using rule-based pricing for the batch: {e}")
+                min_prices, max_prices = rule_min_prices, rule_max_prices
+                confidences = np.full(len(features_list), 0.7)
+        
+        return [
+            {
+                'min_price': round(float(min_prices[i]), 2),
+                'max_price': round(float(max_prices[i]), 2),
+                'confidence': float(confidences[i]),
+                'rationale': f"Based on {experience_levels[i]} level {industries[i]} work in {locations[i]} with {complexities[i]} complexity"
+            }
+            for i in range(len(features_list))
+        ]
     
-    def _encode_features(self, features: Dict) -> List:
-        """Encode features for ML model"""
-        encoded = []
+    def _encode_matrix(self, columns: Dict[str, List[str]], durations: np.ndarray,
+                       label_encoders: Dict) -> Tuple[np.ndarray, np.ndarray]:
+        """Encode a batch column-wise into a feature matrix and a mask of encodable rows"""
+        n_rows = len(durations)
+        X = np.empty((n_rows, len(self.FEATURE_COLUMNS)), dtype=float)
+        known = np.ones(n_rows, dtype=bool)
         
-        # Encode categorical features
-        for feature, value in features.items():
-            if feature in self.label_encoders:
-                encoded.append(self.label_encoders[feature].transform([value])[0])
-            else:
-                encoded.append(value)
+        for j, col in enumerate(self.FEATURE_COLUMNS):
+            if col == 'duration_hours':
+                X[:, j] = durations
+                continue
+            lookup = {label: code for code, label in enumerate(label_encoders[col].classes_)}
+            codes = np.fromiter((lookup.get(v, -1) for v in columns[col]), dtype=float, count=n_rows)
+            known &= codes >= 0
+            X[:, j] = codes
         
-        return encoded
+        return X, known
     
     def train_model(self, training_data: List[Dict]):
         """Train ML model with new data"""
         if not training_data:
             return
         
-        # Prepare training data
-        X = []
-        y = []
-        
-        for item in training_data:
-            features = [
-                item.get('industry', ''),
-                item.get('location', ''),
-                item.get('experience_level', ''),
-                item.get('complexity', ''),
-                item.get('duration_hours', 0)
-            ]
-            X.append(features)
-            y.append(item.get('final_price', 0))
-        
-        # Encode categorical features
-        X_df = pd.DataFrame(X, columns=['industry', 'location', 'experience_level', 'complexity', 'duration_hours'])
-        
-        for col in ['industry', 'location', 'experience_level', 'complexity']:
-            if col not in self.label_encoders:
-                self.label_encoders[col] = LabelEncoder()
-                X_df[col] = self.label_encoders[col].fit_transform(X_df[col])
-            else:
-                X_df[col] = self.label_encoders[col].transform(X_df[col])
-        
-        # Train model
-        self.model = RandomForestRegressor(n_estimators=100, random_state=42)
-        self.model.fit(X_df.values, y)
+        model, label_encoders = fit_pricing_model(training_data, *self.fitted)
+        self.swap_model(model, label_encoders)
         
         # Save model
         self.save_model()
         print("Model trained and saved successfully")
 
+def load_pickled_model() -> Tuple["RandomForestRegressor", Dict]:
+    """Load the full sklearn forest and encoders from MODEL_PATH"""
+    with open(settings.MODEL_PATH, 'rb') as f:
+        model_data = pickle.load(f)
+    return model_data['model'], model_data['encoders']
+
+def fit_pricing_model(training_data: List[Dict], model: Optional["RandomForestRegressor"],
+                      label_encoders: Dict) -> Tuple["RandomForestRegressor", Dict]:
+    """Fit a pricing forest without touching any live PricingModel
+    
+    Works on copies of model and label_encoders and returns the new
+    (model, encoders) pair, so it can run in a worker process and be swapped
+    in afterwards. With MODEL_WARM_START and an existing model, trees fitted
+    on training_data are added to that ensemble instead of replacing it.
+    """
+    import pandas as pd
+    from sklearn.ensemble import RandomForestRegressor
+    from sklearn.preprocessing import LabelEncoder
+    
+    label_encoders = copy.deepcopy(label_encoders)
+    
+    # Prepare training data
+    X = []
+    y = []
+    
+    for item in training_data:
+        features = [
+            item.get('industry', ''),
+            item.get('location', ''),
+            item.get('experience_level', ''),
+            item.get('complexity', ''),
+            item.get('duration_hours', 0)
+        ]
+        X.append(features)
+        y.append(item.get('final_price', 0))
+    
+    # Encode categorical features
+    X_df = pd.DataFrame(X, columns=PricingModel.FEATURE_COLUMNS)
+    
+    for col in ['industry', 'location', 'experience_level', 'complexity']:
+        if col not in label_encoders:
+            label_encoders[col] = LabelEncoder()
+            X_df[col] = label_encoders[col].fit_transform(X_df[col])
+        else:
+            X_df[col] = label_encoders[col].transform(X_df[col])
+    
+    # Train model
+    if settings.MODEL_WARM_START and isinstance(model, ForestArtifact):
+        # The inference artifact cannot grow trees, extend the pickled forest instead
+        model = load_pickled_model()[0] if os.path.exists(settings.MODEL_PATH) else None
+    
+    if settings.MODEL_WARM_START and model is not None:
+        model = copy.deepcopy(model)
+        model.set_params(
+            warm_start=True,
+            n_estimators=len(model.estimators_) + settings.MODEL_WARM_START_TREES,
+            n_jobs=settings.MODEL_N_JOBS
+        )
+        model.fit(X_df.values, y)
+        
+        # Forget the oldest trees once the ensemble outgrows its cap
+        if len(model.estimators_) > settings.MODEL_MAX_ESTIMATORS:
+            model.estimators_ = model.estimators_[-settings.MODEL_MAX_ESTIMATORS:]
+            model.n_estimators = len(model.estimators_)
+    else:
+        model = RandomForestRegressor(
+            n_estimators=settings.MODEL_N_ESTIMATORS,
+            max_depth=settings.MODEL_MAX_DEPTH,
+            n_jobs=settings.MODEL_N_JOBS,
+            random_state=42
+        )
+        model.fit(X_df.values, y)
+    
+    # Predictions are mostly single rows, where thread fan-out only adds latency
+    model.n_jobs = 1
+    
+    return model, label_encoders
+
 # Global model instance
 pricing_model = PricingModel() 
\ No newline at end of file
@@ -0,0 +1,42 @@
+from typing import Optional
+
+from sqlalchemy import case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import Quote, QuoteItem
+
+async def item_revenue(db: AsyncSession, user_id: int, status: Optional[str] = None, limit: int = 50):
+    """Quantity and revenue per item description across a user's quotes, largest first"""
+    revenue = func.sum(QuoteItem.total).label("revenue")
+    statement = (select(QuoteItem.description.label("description"),
+                        func.count(func.distinct(QuoteItem.quote_id)).label("quotes"),
+                        func.sum(QuoteItem.quantity).label("quantity"),
+                        revenue,
+                        func.avg(QuoteItem.unit_price).label("average_unit_price"))
+                 .join(Quote, Quote.id == QuoteItem.quote_id)
+                 .where(Quote.user_id == user_id))
+    if status:
+        statement = statement.where(Quote.status == status)
+    statement = statement.group_by(QuoteItem.description).order_by(revenue.desc()).limit(limit)
+    return (await db.execute(statement)).all()
+
+async def industry_pricing(db: AsyncSession, user_id: int, status: Optional[str] = None):
+    """Item count, average unit price and revenue per industry across a user's quotes"""
+    statement = (select(Quote.industry.label("industry"),
+                        func.count(QuoteItem.id).label("items"),
+                        func.avg(QuoteItem.unit_price).label("average_unit_price"),
+                        func.sum(QuoteItem.total).label("revenue"))
+                 .join(QuoteItem, QuoteItem.quote_id == Quote.id)
+                 .where(Quote.user_id == user_id))
+    if status:
+        statement = statement.where(Quote.status == status)
+    statement = statement.group_by(Quote.industry).order_by(Quote.industry)
+    return (await db.execute(statement)).all()
+
+async def quote_totals(db: AsyncSession, user_id: int):
+    """Number of quotes, their total value and how many were accepted across all of a user's quotes"""
+    statement = (select(func.count(Quote.id).label("total_quotes"),
+                        func.coalesce(func.sum(Quote.final_price), 0.0).label("total_value"),
+                        func.coalesce(func.sum(case((Quote.status == "accepted", 1), else_=0)), 0).label("accepted_quotes"))
+                 .where(Quote.user_id == user_id))
+    return (await db.execute(statement)).one()
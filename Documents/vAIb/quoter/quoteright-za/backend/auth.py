@@ -1,11 +1,17 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Dict, Optional, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException, status
 from config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Hashes made with any other work factor count as deprecated and are replaced at login
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
@@ -13,6 +19,88 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """(matches, new hash if the stored one should be replaced)"""
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+class PasswordHasher:
+    """bcrypt on a bounded worker pool, off the event loop
+
+    A bcrypt hash is deliberately slow, and computed inline it stalls every
+    other request for its duration. Here it runs on a pool of PASSWORD_WORKERS
+    threads or processes (PASSWORD_EXECUTOR); bcrypt releases the GIL, so
+    threads hash in parallel. At most max_pending hashes may be queued or
+    running, past that callers get a 503 with Retry-After straight away rather
+    than waiting behind a burst of logins.
+    """
+
+    def __init__(self, workers: int = 2, max_pending: int = 64, executor: str = "thread"):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.executor = executor
+        self._lock = threading.Lock()
+        self._pool = None
+        self.pending = 0
+        self.completed = self.rejected = 0
+        self.total_wait = 0.0
+
+    def _executor(self):
+        with self._lock:
+            if self._pool is None:
+                if self.executor == "process":
+                    self._pool = ProcessPoolExecutor(max_workers=self.workers)
+                else:
+                    self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hashing")
+            return self._pool
+
+    async def _run(self, fn, *args):
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Too many sign-ins at once, try again shortly",
+                    headers={"Retry-After": "1"},
+                )
+            self.pending += 1
+        start = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor(), fn, *args)
+        finally:
+            with self._lock:
+                self.pending -= 1
+                self.completed += 1
+                self.total_wait += time.perf_counter() - start
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """(matches, new hash if the stored one uses an old work factor)"""
+        return await self._run(verify_and_update_password, plain_password, hashed_password)
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "executor": self.executor,
+                "workers": self.workers,
+                "rounds": settings.BCRYPT_ROUNDS,
+                "pending": self.pending,
+                "max_pending": self.max_pending,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "average_ms": self.total_wait / self.completed * 1000 if self.completed else 0.0,
+            }
+
+# Global password hasher instance
+password_hasher = PasswordHasher(settings.PASSWORD_WORKERS, settings.PASSWORD_MAX_PENDING, settings.PASSWORD_EXECUTOR)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -23,24 +111,92 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
-def verify_token(token: str) -> Optional[str]:
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
+def user_claims(user) -> dict:
+    """Claims identifying a user in their access token"""
+    return {"sub": user.email, "uid": user.id, "tier": user.subscription_tier}
+
+class TokenCache:
+    """Bounded LRU of verified token payloads, each kept until its token expires
+
+    Verifying a JWT means an HMAC check on every request, so a token that has
+    already been verified is looked up here instead.
+    """
+
+    def __init__(self, max_size: int = 4096):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def get(self, token: str) -> Optional[Dict]:
+        with self._lock:
+            payload = self._entries.get(token)
+            if payload is not None and payload["exp"] <= time.time():
+                del self._entries[token]
+                payload = None
+            if payload is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return payload
+
+    def put(self, token: str, payload: Dict):
+        if self.max_size <= 0 or "exp" not in payload:
+            return
+        with self._lock:
+            self._entries[token] = payload
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            size = len(self._entries)
+        lookups = self.hits + self.misses
+        return {
+            "size": size,
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+# Global token cache instance
+token_cache = TokenCache(settings.TOKEN_CACHE_SIZE)
+
+def decode_token(token: str) -> Optional[Dict]:
+    """The token's claims if it is valid and unexpired, otherwise None"""
+    payload = token_cache.get(token)
+    if payload is None:
+        try:
+            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        except JWTError:
             return None
-        return email
-    except JWTError:
+        token_cache.put(token, payload)
+    return payload
+
+def verify_token(token: str) -> Optional[str]:
+    payload = decode_token(token)
+    if payload is None:
         return None
+    return payload.get("sub")
 
-def get_current_user_email(token: str) -> str:
+def get_current_user_claims(token: str) -> Dict:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     
-    email = verify_token(token)
-    if email is None:
+    payload = decode_token(token)
+    if payload is None or payload.get("sub") is None:
         raise credentials_exception
-    return email 
\ No newline at end of file
+    return payload
+
+def get_current_user_email(token: str) -> str:
+    return get_current_user_claims(token)["sub"]
@@ -0,0 +1,46 @@
+"""
+Scaffolding shared by the benchmarks: the backend on sys.path, a throwaway
+work directory for databases, models and caches, and latency percentiles
+
+Import it before anything from the backend, settings are read from the
+environment when config is first imported.
+"""
+
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+from typing import Optional
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# Keep everything a benchmark writes away from the real files
+WORK_DIR = tempfile.mkdtemp()
+
+def work_path(*parts: str) -> str:
+    return os.path.join(WORK_DIR, *parts)
+
+def configure(database: Optional[str] = "bench.db", **environ: str):
+    """Set the app's settings for a run, before anything reads them
+
+    database is an SQLite file created in WORK_DIR, None leaves DATABASE_URL
+    alone. Other settings are given by name, e.g. MODEL_WARMUP="false".
+    """
+    if database:
+        os.environ["DATABASE_URL"] = f"sqlite:///{work_path(database)}"
+    os.environ.update(environ)
+
+def percentile(values, pct: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+def run_benchmark(main):
+    """Run main(), on an event loop if it is a coroutine function, then remove WORK_DIR"""
+    try:
+        result = main()
+        if asyncio.iscoroutine(result):
+            asyncio.run(result)
+    finally:
+        shutil.rmtree(WORK_DIR, ignore_errors=True)
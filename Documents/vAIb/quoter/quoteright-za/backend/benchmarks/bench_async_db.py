@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Benchmark 200 concurrent GET /quotes reads on the AsyncSession endpoints
+against the previous blocking Session ones, on their own and while a slow
+query is running
+
+The slow query stands in for a lock wait or a long round trip to a database
+server: it sleeps inside the driver rather than using CPU.
+
+The blocking versions of the endpoint and its dependencies are rebuilt here
+as they were before the port: sync dependencies in the threadpool and a sync
+query inside the async def endpoint, on the event loop. They get a pool with a
+connection per request, because with the default 5 + 10 connections they stall
+at more than 15 concurrent requests: an endpoint waiting for a connection
+blocks the loop, so requests holding one can never finish and return it.
+
+Run from the backend directory: python benchmarks/bench_async_db.py [concurrency] [slow query ms]
+"""
+
+import asyncio
+import json
+import sys
+import time
+from datetime import datetime, UTC
+
+from _common import configure, percentile, run_benchmark
+
+# Keep the benchmark database away from the real one
+configure(MODEL_WARMUP="false")
+
+import httpx
+from fastapi import Depends
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, sessionmaker
+
+import main as api
+from auth import get_current_user_email
+from config import settings
+from database import SessionLocal, User, Quote, async_engine, get_db
+from schemas import QuotePage
+from user_cache import user_cache
+
+SLOW_QUERY = text("SELECT sleep_ms(:ms)")
+
+CONCURRENCY = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+blocking_engine = create_engine(settings.DATABASE_URL, pool_size=CONCURRENCY + 5, connect_args={"check_same_thread": False})
+BlockingSession = sessionmaker(bind=blocking_engine)
+
+def sleep_ms(ms):
+    time.sleep(ms / 1000)
+    return ms
+
+for bench_engine in (blocking_engine, async_engine.sync_engine):
+    event.listen(bench_engine, "connect", lambda connection, record: connection.create_function("sleep_ms", 1, sleep_ms))
+
+def get_sync_db():
+    db = BlockingSession()
+    try:
+        yield db
+    finally:
+        db.close()
+
+def get_sync_user(credentials: HTTPAuthorizationCredentials = Depends(api.security), db: Session = Depends(get_sync_db)):
+    email = get_current_user_email(credentials.credentials)
+    user = user_cache.get(email)
+    if user is None:
+        user = db.query(User).filter(User.email == email).first()
+        user_cache.put(email, user)
+    return user
+
+@api.app.get("/blocking/quotes", response_model=QuotePage)
+async def blocking_quotes(limit: int = 50, current_user: User = Depends(get_sync_user), db: Session = Depends(get_sync_db)):
+    quotes = (db.query(Quote).filter(Quote.user_id == current_user.id)
+              .order_by(Quote.created_at.desc(), Quote.id.desc()).limit(limit + 1).all())
+    return {"items": quotes[:limit], "next_cursor": None}
+
+@api.app.get("/blocking/slow")
+async def blocking_slow(ms: int, current_user: User = Depends(get_sync_user), db: Session = Depends(get_sync_db)):
+    return {"slept": db.execute(SLOW_QUERY, {"ms": ms}).scalar()}
+
+@api.app.get("/async/slow")
+async def async_slow(ms: int, current_user: User = Depends(api.get_current_user), db: AsyncSession = Depends(get_db)):
+    return {"slept": (await db.execute(SLOW_QUERY, {"ms": ms})).scalar()}
+
+def add_quotes(user_id: int, n: int):
+    details = json.dumps({"items": [{"description": "Labour", "quantity": 2.0, "unit_price": 150.0, "total": 300.0}] * 5})
+    db = SessionLocal()
+    db.bulk_save_objects([
+        Quote(user_id=user_id, industry="plumbing", job_title=f"Job {i}", location="gauteng",
+              duration="6 hours", experience_level="intermediate", ai_recommendation_min=800.0,
+              ai_recommendation_max=1200.0, final_price=1500.0, status="draft",
+              quote_data=details, created_at=datetime.now(UTC))
+        for i in range(n)
+    ])
+    db.commit()
+    db.close()
+
+async def run(client, read_path: str, slow_path: str, headers, concurrency: int, slow_ms: int):
+    """(wall seconds, per-request latencies) for concurrency reads, optionally sent just after one slow query
+
+    Latencies are measured from when the batch is sent, so time spent waiting
+    for a blocked event loop counts against the reads.
+    """
+    async def read():
+        response = await client.get(read_path, params={"limit": 50}, headers=headers)
+        response.raise_for_status()
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    slow = None
+    if slow_ms:
+        slow = asyncio.create_task(client.get(slow_path, params={"ms": slow_ms}, headers=headers))
+        # Let the slow request reach its query before the reads arrive
+        await asyncio.sleep(0.01)
+    latencies = await asyncio.gather(*(read() for _ in range(concurrency)))
+    wall = time.perf_counter() - start
+    if slow is not None:
+        (await slow).raise_for_status()
+    return wall, latencies
+
+async def main():
+    slow_ms = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+
+    # Everything runs on one loop, the async engine's connections belong to the loop that opened them
+    transport = httpx.ASGITransport(app=api.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        token = (await client.post("/auth/register", json={
+            "email": "bench@example.com", "password": "bench-password", "business_name": "Bench Plumbing",
+            "industry": "plumbing", "experience_level": "intermediate"})).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        add_quotes((await client.get("/auth/me", headers=headers)).json()["id"], 500)
+
+        print(f"{CONCURRENCY} concurrent reads of 50 quotes, the slow query takes {slow_ms}ms")
+        print(f"{'session':<10} {'slow query':<11} {'wall':>9} {'p50':>9} {'p99':>9}")
+        for label, ms in (("no", 0), ("yes", slow_ms)):
+            for session, read_path, slow_path in (("Session", "/blocking/quotes", "/blocking/slow"),
+                                                  ("Async", "/quotes", "/async/slow")):
+                wall, latencies = await run(client, read_path, slow_path, headers, CONCURRENCY, ms)
+                print(f"{session:<10} {label:<11} {wall * 1000:>7.0f}ms {percentile(latencies, 50) * 1000:>7.0f}ms "
+                      f"{percentile(latencies, 99) * 1000:>7.0f}ms")
+
+if __name__ == "__main__":
+    run_benchmark(main)
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Benchmark the get_current_user dependency: JWT verification plus the user
+lookup, with neither cache, with only the user cache, and with the token cache
+as well
+
+Run from the backend directory: python benchmarks/bench_auth.py
+"""
+
+import asyncio
+import time
+
+from _common import configure, run_benchmark
+
+# Keep the benchmark database away from the real one
+configure(MODEL_WARMUP="false")
+
+from fastapi.security import HTTPAuthorizationCredentials
+from fastapi.testclient import TestClient
+
+import main as api
+from auth import token_cache
+from database import AsyncSessionLocal
+from user_cache import user_cache
+
+DURATION = 3.0
+
+async def measure(credentials, clear_users: bool, clear_tokens: bool) -> float:
+    """Mean microseconds per get_current_user call, as run for each request"""
+    count, start = 0, time.perf_counter()
+    while time.perf_counter() - start < DURATION:
+        if clear_users:
+            user_cache.clear()
+        if clear_tokens:
+            token_cache.clear()
+        async with AsyncSessionLocal() as db:
+            await api.get_current_user(credentials, db)
+        count += 1
+    return (time.perf_counter() - start) / count * 1e6
+
+def main():
+    with TestClient(api.app) as client:
+        token = client.post("/auth/register", json={
+            "email": "bench@example.com", "password": "bench-password", "business_name": "Bench Plumbing",
+            "industry": "plumbing", "experience_level": "intermediate"}).json()["access_token"]
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+    print(f"{'caches':<16} {'us/request':>11}")
+    baseline = None
+    for label, clear_users, clear_tokens in (("none", True, True), ("user", False, True), ("user + token", False, False)):
+        micros = asyncio.run(measure(credentials, clear_users, clear_tokens))
+        baseline = baseline or micros
+        print(f"{label:<16} {micros:>11.1f}  ({baseline / micros:.1f}x)")
+
+if __name__ == "__main__":
+    run_benchmark(main)
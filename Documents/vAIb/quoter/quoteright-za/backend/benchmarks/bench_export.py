@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark quote exports: throughput and process peak RSS while streaming a
+user's quotes as CSV, JSONL and a ZIP of freshly rendered documents, at growing
+export sizes. Constant memory shows as peak RSS levelling off as exports grow.
+
+Run from the backend directory: python benchmarks/bench_export.py [quotes...]
+"""
+
+import json
+import resource
+import sys
+import time
+from datetime import datetime, UTC
+
+from _common import configure, run_benchmark, work_path
+
+# Keep the benchmark database and documents away from the real ones
+configure(UPLOAD_DIR=work_path("uploads"), TEMPLATE_CACHE_DIR=work_path("jinja"))
+
+from database import SessionLocal, User, Quote
+from document_jobs import document_jobs
+from exports import export_csv, export_jsonl, export_zip
+
+def add_quotes(user_id: int, n: int):
+    items = [{"description": f"Item {i}", "quantity": 1, "unit_price": 100.0, "total": 100.0} for i in range(10)]
+    db = SessionLocal()
+    db.bulk_save_objects([
+        Quote(user_id=user_id, industry="plumbing", job_title=f"Job {i}", location="gauteng",
+              duration="6 hours", experience_level="intermediate", ai_recommendation_min=800.0,
+              ai_recommendation_max=1200.0, final_price=1000.0, status="draft",
+              quote_data=json.dumps({"items": items, "terms": "50% deposit", "validity_days": 30}),
+              created_at=datetime.now(UTC))
+        for i in range(n)
+    ])
+    db.commit()
+    db.close()
+
+def consume(stream):
+    start = time.perf_counter()
+    size = sum(len(chunk) for chunk in stream)
+    return time.perf_counter() - start, size
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def add_user(email: str):
+    db = SessionLocal()
+    user = User(email=email, hashed_password="-", business_name="Bench Plumbing",
+                industry="plumbing", experience_level="intermediate")
+    db.add(user)
+    db.commit()
+    user_id = user.id
+    db.close()
+    return user_id
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [100, 1000]
+    branding = {"business_name": "Bench Plumbing", "logo_url": None}
+    # Seed everything first so peak RSS only moves for the exports themselves
+    users = {}
+    for n in [1] + sizes:
+        users[n] = add_user(f"bench{n}@example.com")
+        add_quotes(users[n], n)
+
+    # Load reportlab and a renderer up front so they aren't counted as export growth
+    list(export_zip(users[1], branding))
+    print(f"{'quotes':>7} {'format':<7} {'time':>8} {'rows/s':>9} {'size':>10} {'peak RSS':>10}")
+    print(f"{'':>7} {'seeded':<7} {'':>8} {'':>9} {'':>10} {peak_rss_mb():>8.1f}MB")
+    for n in sizes:
+        for name, stream in (("csv", export_csv(users[n])), ("jsonl", export_jsonl(users[n])),
+                             ("zip", export_zip(users[n], branding))):
+            elapsed, size = consume(stream)
+            print(f"{n:>7} {name:<7} {elapsed:>7.2f}s {n / elapsed:>9,.0f} {size / 1e6:>8.2f}MB {peak_rss_mb():>8.1f}MB")
+    document_jobs.shutdown()
+
+if __name__ == "__main__":
+    run_benchmark(main)
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark POST /auth/login under concurrent load with bcrypt on the auth
+worker pool against the previous inline verify on the event loop
+
+Alongside the logins a probe requests GET / every 10ms, its latency is how
+long any other request waits while logins are being handled. Logins/s is
+bounded by the cores available to bcrypt either way; what the pool changes is
+that the loop stays free for everything else.
+
+The inline version of the endpoint is rebuilt here as it was before the
+change: the bcrypt verify inside the async def endpoint, holding its
+connection throughout.
+
+Run from the backend directory: python benchmarks/bench_login.py [logins] [concurrency] [rounds]
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+from _common import configure, percentile, run_benchmark
+
+# Keep the benchmark database away from the real one
+configure(MODEL_WARMUP="false",
+          # Every inline login waits on the pool behind the others, that is expected here
+          DB_SLOW_CHECKOUT_MS="60000",
+          BCRYPT_ROUNDS=sys.argv[3] if len(sys.argv) > 3 else "10")
+
+import httpx
+from fastapi import Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import main as api
+from auth import create_access_token, password_hasher, user_claims, verify_password
+from config import settings
+from database import User, get_db
+from schemas import Token, UserLogin
+
+@api.app.post("/blocking/login", response_model=Token)
+async def blocking_login(user_data: UserLogin, db: AsyncSession = Depends(get_db)):
+    user = await db.scalar(select(User).where(User.email == user_data.email))
+    if not user or not verify_password(user_data.password, user.hashed_password):
+        raise HTTPException(status_code=401, detail="Incorrect email or password")
+    return {"access_token": create_access_token(data=user_claims(user)), "token_type": "bearer"}
+
+async def run(client, path: str, n: int, concurrency: int):
+    """(wall seconds, successful logins, 503s, probe latencies) for n logins from concurrency clients"""
+    credentials = {"email": "bench@example.com", "password": "bench-password"}
+    done = asyncio.Event()
+
+    async def worker(worker_id: int):
+        ok = rejected = 0
+        for _ in range(worker_id, n, concurrency):
+            response = await client.post(path, json=credentials)
+            if response.status_code == 503:
+                rejected += 1
+                await asyncio.sleep(float(response.headers.get("Retry-After", "1")))
+                continue
+            response.raise_for_status()
+            ok += 1
+        return ok, rejected
+
+    async def probe():
+        # Measured from when each probe was due, so time the loop spent blocked counts against it
+        latencies = []
+        due = time.perf_counter()
+        while not done.is_set():
+            (await client.get("/")).raise_for_status()
+            latencies.append(time.perf_counter() - due)
+            due = max(due + 0.01, time.perf_counter())
+            await asyncio.sleep(due - time.perf_counter())
+        return latencies
+
+    start = time.perf_counter()
+    probing = asyncio.create_task(probe())
+    results = await asyncio.gather(*(worker(w) for w in range(concurrency)))
+    wall = time.perf_counter() - start
+    done.set()
+    latencies = await probing
+    return wall, sum(ok for ok, _ in results), sum(rejected for _, rejected in results), latencies
+
+async def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+
+    # Everything runs on one loop, the async engine's connections belong to the loop that opened them
+    transport = httpx.ASGITransport(app=api.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        (await client.post("/auth/register", json={
+            "email": "bench@example.com", "password": "bench-password", "business_name": "Bench Plumbing",
+            "industry": "plumbing", "experience_level": "intermediate"})).raise_for_status()
+
+        print(f"{n} logins from {concurrency} concurrent clients, bcrypt work factor {settings.BCRYPT_ROUNDS}, "
+              f"{password_hasher.workers} {password_hasher.executor} workers, {os.cpu_count()} CPUs")
+        print(f"{'bcrypt':<8} {'logins/s':>9} {'wall':>9} {'503s':>5} {'probe p50':>10} {'probe p99':>10} {'probe max':>10}")
+        for label, path in (("inline", "/blocking/login"), ("pool", "/auth/login")):
+            wall, ok, rejected, latencies = await run(client, path, n, concurrency)
+            print(f"{label:<8} {ok / wall:>9.1f} {wall:>8.2f}s {rejected:>5} {percentile(latencies, 50) * 1000:>8.1f}ms "
+                  f"{percentile(latencies, 99) * 1000:>8.1f}ms {max(latencies) * 1000:>8.1f}ms")
+    password_hasher.shutdown()
+
+if __name__ == "__main__":
+    run_benchmark(main)
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark the flat forest artifact against the pickled forest:
+artifact size, load time and per-worker memory with several workers loaded at once
+
+Run from the backend directory: python benchmarks/bench_model_artifact.py [rows] [workers]
+"""
+
+import os
+import subprocess
+import sys
+import time
+
+from _common import BACKEND_DIR, configure, run_benchmark, work_path
+
+# Keep the benchmark model away from the real one
+configure(database=None, MODEL_PATH=work_path("pricing_model.pkl"),
+          MODEL_ARTIFACT_PATH=work_path("pricing_model.forest"))
+
+from ai_model import PricingModel
+from bench_training import make_training
+from config import settings
+
+WORKER = """
+import os, pickle, sys, time
+import numpy as np
+import sklearn.ensemble
+from forest_artifact import ForestArtifact
+
+def memory_kb():
+    fields = {}
+    for name in ('/proc/self/status', '/proc/self/smaps_rollup'):
+        with open(name) as f:
+            for line in f:
+                key, _, rest = line.partition(':')
+                if key in ('VmRSS', 'Pss'):
+                    fields[key] = int(rest.split()[0])
+    return fields
+
+fmt, path, start_at = sys.argv[1], sys.argv[2], float(sys.argv[3])
+before = memory_kb()
+start = time.perf_counter()
+if fmt == 'pickle':
+    with open(path, 'rb') as f:
+        model = pickle.load(f)['model']
+else:
+    model = ForestArtifact.load(path)
+load_time = time.perf_counter() - start
+model.predict(np.random.RandomState(0).rand(2000, 5) * [8, 9, 3, 4, 80])
+
+# Measure once every worker has loaded, so shared pages are split between them
+time.sleep(max(0.0, start_at - time.time()))
+after = memory_kb()
+print(load_time, after['VmRSS'] - before['VmRSS'], after['Pss'] - before['Pss'])
+"""
+
+def directory_size(path: str) -> int:
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+def run_workers(fmt: str, path: str, workers: int):
+    start_at = time.time() + 10
+    procs = [subprocess.Popen([sys.executable, "-c", WORKER, fmt, path, str(start_at)],
+                              cwd=BACKEND_DIR, stdout=subprocess.PIPE, text=True)
+             for _ in range(workers)]
+    results = [tuple(float(v) for v in p.communicate()[0].split()) for p in procs]
+    load = sum(r[0] for r in results) / workers
+    rss = sum(r[1] for r in results) / workers / 1024
+    pss = sum(r[2] for r in results) / workers / 1024
+    return load, rss, pss
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+
+    model = PricingModel()
+    model.train_model(make_training(rows))
+    # Warm the page cache so both formats are measured from memory
+    for path in (settings.MODEL_PATH, settings.MODEL_ARTIFACT_PATH):
+        run_workers('pickle' if path.endswith('.pkl') else 'artifact', path, 1)
+
+    print(f"\nForest fitted on {rows:,} rows, {workers} workers loading concurrently")
+    print(f"{'format':<10} {'size':>10} {'load':>10} {'RSS/worker':>12} {'PSS/worker':>12}")
+    for fmt, path in (('pickle', settings.MODEL_PATH), ('artifact', settings.MODEL_ARTIFACT_PATH)):
+        load, rss, pss = run_workers(fmt, path, workers)
+        print(f"{fmt:<10} {directory_size(path) / 1e6:>8.1f}MB {load * 1000:>8.1f}ms "
+              f"{rss:>10.1f}MB {pss:>10.1f}MB")
+
+if __name__ == "__main__":
+    run_benchmark(main)
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Benchmark quote PDF output: PDFs/sec with a renderer and logo set up per document
+against the warm renderer pool, and peak memory of one render
+
+Run from the backend directory: python benchmarks/bench_pdf.py [items...]
+"""
+
+import os
+import resource
+import sys
+import time
+import tracemalloc
+
+from _common import run_benchmark, work_path
+
+from PIL import Image
+
+from bench_render import make_quote
+from pdf_generator import PDFGenerator
+from pdf_renderer import QuotePDFRenderer
+
+DURATION = 2.0
+
+def pdfs_per_sec(render) -> float:
+    render()
+    count, start = 0, time.perf_counter()
+    while time.perf_counter() - start < DURATION:
+        render()
+        count += 1
+    return count / (time.perf_counter() - start)
+
+def peak_memory_mb(render) -> float:
+    tracemalloc.start()
+    render()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1e6
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1, 10, 100]
+    logo_path = work_path("logo.png")
+    # A photo-like logo, noise doesn't compress away like a flat colour would
+    Image.frombytes("RGB", (1200, 600), os.urandom(1200 * 600 * 3)).save(logo_path)
+    generator = PDFGenerator()
+
+    print(f"{'items':>6} {'per-document/s':>15} {'pooled/s':>10} {'speedup':>8} {'size':>9} {'peak heap':>10}")
+    for n in sizes:
+        quote, user = make_quote(n)
+        user['logo_url'] = logo_path
+
+        def cold():
+            return QuotePDFRenderer().render(generator.quote_context(quote, user))
+
+        def pooled():
+            return generator.generate_quote_pdf(quote, user)
+
+        before = pdfs_per_sec(cold)
+        after = pdfs_per_sec(pooled)
+        size_kb = len(pooled()) / 1024
+        print(f"{n:>6} {before:>15,.1f} {after:>10,.1f} {after / before:>7.1f}x "
+              f"{size_kb:>7.1f}KB {peak_memory_mb(pooled):>8.2f}MB")
+
+    print(f"\nProcess peak RSS: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f} MB")
+
+if __name__ == "__main__":
+    run_benchmark(main)
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Benchmark single-row vs batch pricing prediction (rows/sec)
+
+Run from the backend directory: python benchmarks/bench_predict.py
+"""
+
+import random
+import time
+
+from _common import configure, run_benchmark, work_path
+
+# Keep the benchmark model away from the real one
+configure(database=None, MODEL_PATH=work_path("pricing_model.pkl"), MODEL_ARTIFACT_PATH=work_path("pricing_model.forest"))
+
+from ai_model import PricingModel
+
+INDUSTRIES = ['graphic_design', 'web_development', 'copywriting', 'photography',
+              'plumbing', 'electrical', 'consulting', 'marketing']
+LOCATIONS = ['gauteng', 'western_cape', 'kwazulu_natal', 'eastern_cape', 'free_state',
+             'mpumalanga', 'limpopo', 'north_west', 'northern_cape']
+EXPERIENCE_LEVELS = ['junior', 'mid', 'senior']
+COMPLEXITIES = ['simple', 'standard', 'complex', 'expert']
+ROW_COUNTS = [1, 100, 10_000]
+
+def make_rows(n: int, seed: int = 0):
+    rng = random.Random(seed)
+    return [
+        {
+            'industry': rng.choice(INDUSTRIES),
+            'location': rng.choice(LOCATIONS),
+            'experience_level': rng.choice(EXPERIENCE_LEVELS),
+            'complexity': rng.choice(COMPLEXITIES),
+            'duration_hours': rng.uniform(1, 80),
+        }
+        for _ in range(n)
+    ]
+
+def rows_per_sec(fn, rows, min_time: float = 0.5) -> float:
+    done = 0
+    start = time.perf_counter()
+    while True:
+        fn(rows)
+        done += len(rows)
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return done / elapsed
+
+def run(label: str, model: PricingModel):
+    print(f"\n{label}")
+    print(f"{'rows':>8} {'predict_price':>16} {'predict_many':>16} {'speedup':>8}")
+    for n in ROW_COUNTS:
+        rows = make_rows(n)
+        single = rows_per_sec(lambda rs: [model.predict_price(r) for r in rs], rows)
+        batch = rows_per_sec(model.predict_many, rows)
+        print(f"{n:>8} {single:>14,.0f}/s {batch:>14,.0f}/s {batch / single:>7.1f}x")
+
+def main():
+    model = PricingModel()
+    run("Rule-based pricing", model)
+
+    training = make_rows(2_000, seed=1)
+    for row in training:
+        low, high = model.rule_based_pricing(row['industry'], row['location'], row['experience_level'],
+                                             row['complexity'], row['duration_hours'])
+        row['final_price'] = (low + high) / 2
+    model.train_model(training)
+    run("RandomForest pricing", model)
+
+if __name__ == "__main__":
+    run_benchmark(main)
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: compiled pricing table vs nested dict lookups
+
+Run from the backend directory: python benchmarks/bench_pricing_table.py
+"""
+
+import time
+
+import numpy as np
+
+from _common import run_benchmark
+
+from ai_model import PricingModel
+from bench_predict import make_rows
+
+def dict_hourly_rate(model: PricingModel, industry: str, location: str, experience_level: str, complexity: str) -> float:
+    """The pre-table rule-based lookup, kept here as the baseline"""
+    base_price = model.base_prices.get(industry, {}).get(experience_level, 200)
+    location_mult = model.location_multipliers.get(location.lower(), 1.0)
+    complexity_mult = model.complexity_multipliers.get(complexity, 1.0)
+    return base_price * location_mult * complexity_mult
+
+def dict_hourly_rates(model: PricingModel, industries, locations, experience_levels, complexities) -> np.ndarray:
+    """Batch baseline: per-row dict lookups gathered into arrays"""
+    base = np.array([model.base_prices.get(i, {}).get(e, 200) for i, e in zip(industries, experience_levels)], dtype=float)
+    location_mult = np.array([model.location_multipliers.get(l.lower(), 1.0) for l in locations], dtype=float)
+    complexity_mult = np.array([model.complexity_multipliers.get(c, 1.0) for c in complexities], dtype=float)
+    return base * location_mult * complexity_mult
+
+def ns_per_row(fn, arg, n_rows: int, repeat: int = 5) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(arg)
+        best = min(best, time.perf_counter() - start)
+    return best / n_rows * 1e9
+
+def main():
+    model = PricingModel()
+    rows = make_rows(100_000)
+    # A few labels outside the tables exercise the default slots
+    rows += [{'industry': 'carpentry', 'location': 'Gauteng', 'experience_level': 'lead',
+              'complexity': 'trivial', 'duration_hours': 4.0}] * 100
+    keys = [(r['industry'], r['location'], r['experience_level'], r['complexity']) for r in rows]
+
+    for key in keys[:1000] + keys[-100:]:
+        assert model.hourly_rate(*key) == dict_hourly_rate(model, *key), key
+
+    columns = [list(col) for col in zip(*keys)]
+    assert (model.hourly_rates(*columns) == dict_hourly_rates(model, *columns)).all()
+
+    results = [
+        ('dict (per row)', ns_per_row(lambda ks: [dict_hourly_rate(model, *k) for k in ks], keys, len(keys))),
+        ('table (per row)', ns_per_row(lambda ks: [model.hourly_rate(*k) for k in ks], keys, len(keys))),
+        ('dict (batch)', ns_per_row(lambda cs: dict_hourly_rates(model, *cs), columns, len(keys))),
+        ('table (batch gather)', ns_per_row(lambda cs: model.hourly_rates(*cs), columns, len(keys))),
+    ]
+
+    print(f"{'path':<24} {'ns/row':>8}")
+    for label, ns in results:
+        print(f"{label:<24} {ns:>8.0f}")
+
+if __name__ == "__main__":
+    run_benchmark(main)
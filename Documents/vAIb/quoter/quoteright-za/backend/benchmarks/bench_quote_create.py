@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Benchmark POST /quotes latency with the quote document rendered inline in the
+request against handing it to the background document queue
+
+Run from the backend directory: python benchmarks/bench_quote_create.py [requests] [items]
+"""
+
+import sys
+import time
+
+from _common import configure, percentile, run_benchmark, work_path
+
+# Keep the benchmark database, model, bytecode cache and documents away from the real ones
+configure(MODEL_PATH=work_path("pricing_model.pkl"), MODEL_ARTIFACT_PATH=work_path("pricing_model.forest"),
+          TEMPLATE_CACHE_DIR=work_path("jinja"), UPLOAD_DIR=work_path("uploads"), MODEL_WARMUP="false")
+
+from fastapi.testclient import TestClient
+
+import main as api
+from document_jobs import document_jobs, render_quote_document
+
+def submit_inline(quote_id, quote_data, user_data, tenant=None):
+    """What create_quote did before the queue: render and write inside the request"""
+    render_quote_document(quote_data, user_data, quote_id, tenant)
+    return {"quote_id": quote_id, "status": "ready", "error": None}
+
+def drain():
+    while any(document_jobs.get(quote_id) for quote_id in list(document_jobs._jobs)):
+        time.sleep(0.001)
+
+def timed_post(client, headers, body) -> float:
+    """One request's latency, then let its queued document finish so background
+    renders do not compete with the next request for the CPU"""
+    start = time.perf_counter()
+    response = client.post("/quotes", json=body, headers=headers)
+    elapsed = time.perf_counter() - start
+    response.raise_for_status()
+    drain()
+    return elapsed
+
+def report(label: str, latencies):
+    print(f"{label:<10} {percentile(latencies, 50) * 1000:>7.2f}ms {percentile(latencies, 99) * 1000:>7.2f}ms")
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    n_items = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    body = {
+        "features": {"industry": "plumbing", "location": "gauteng", "experience_level": "intermediate",
+                     "duration_hours": 6, "job_title": "Geyser replacement"},
+        "client_info": {"name": "Jane Client", "email": "jane@example.com"},
+        "items": [{"description": f"Item {i}", "quantity": 1, "unit_price": 100.0, "total": 100.0}
+                  for i in range(n_items)],
+    }
+
+    with TestClient(api.app) as client:
+        token = client.post("/auth/register", json={
+            "email": "bench@example.com", "password": "bench-password", "business_name": "Bench Plumbing",
+            "industry": "plumbing", "experience_level": "intermediate"}).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        client.post("/quotes", json=body, headers=headers)
+
+        print(f"{n} requests, {n_items} items per quote")
+        print(f"{'document':<10} {'p50':>9} {'p99':>9}")
+        # Alternate the two paths so both see the same database size and cache state
+        inline, queued = [], []
+        for _ in range(n):
+            document_jobs.submit = submit_inline
+            inline.append(timed_post(client, headers, body))
+            del document_jobs.submit
+            queued.append(timed_post(client, headers, body))
+        report("inline", inline)
+        report("queued", queued)
+
+if __name__ == "__main__":
+    run_benchmark(main)
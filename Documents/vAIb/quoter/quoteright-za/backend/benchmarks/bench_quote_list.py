@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Benchmark GET /quotes full pages against view=summary, which leaves the
+quote_data blob and pdf_url out of the query and the response
+
+Run from the backend directory: python benchmarks/bench_quote_list.py [items per quote] [page size]
+"""
+
+import json
+import sys
+import time
+from datetime import datetime, UTC
+
+from _common import configure, run_benchmark
+
+# Keep the benchmark database away from the real one
+configure(MODEL_WARMUP="false")
+
+from fastapi.testclient import TestClient
+
+import main as api
+from database import SessionLocal, Quote
+
+DURATION = 3.0
+
+def add_quotes(user_id: int, n: int, n_items: int):
+    items = [{"description": f"Item {i} with a typical length description", "quantity": 2.0,
+              "unit_price": 150.0, "total": 300.0} for i in range(n_items)]
+    details = json.dumps({"features": {"industry": "plumbing", "location": "gauteng", "duration_hours": 6},
+                          "items": items, "terms": "50% deposit required", "validity_days": 30})
+    db = SessionLocal()
+    db.bulk_save_objects([
+        Quote(user_id=user_id, industry="plumbing", job_title=f"Job {i}", location="gauteng",
+              duration="6 hours", experience_level="intermediate", ai_recommendation_min=800.0,
+              ai_recommendation_max=1200.0, final_price=300.0 * n_items, status="draft",
+              quote_data=details, pdf_url=f"/srv/uploads/documents/{i:064x}.pdf", created_at=datetime.now(UTC))
+        for i in range(n)
+    ])
+    db.commit()
+    db.close()
+
+def main():
+    n_items = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    limit = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    with TestClient(api.app) as client:
+        token = client.post("/auth/register", json={
+            "email": "bench@example.com", "password": "bench-password", "business_name": "Bench Plumbing",
+            "industry": "plumbing", "experience_level": "intermediate"}).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        user_id = client.get("/auth/me", headers=headers).json()["id"]
+        add_quotes(user_id, limit, n_items)
+
+        print(f"Pages of {limit} quotes with {n_items} items each")
+        print(f"{'view':<8} {'pages/s':>9} {'ms/page':>9} {'bytes/page':>12}")
+        for view in ("full", "summary"):
+            params = {"limit": limit, "view": view}
+            size = len(client.get("/quotes", params=params, headers=headers).content)
+            count, start = 0, time.perf_counter()
+            while time.perf_counter() - start < DURATION:
+                client.get("/quotes", params=params, headers=headers)
+                count += 1
+            elapsed = time.perf_counter() - start
+            print(f"{view:<8} {count / elapsed:>9.1f} {elapsed / count * 1000:>9.2f} {size:>12,}")
+
+if __name__ == "__main__":
+    run_benchmark(main)
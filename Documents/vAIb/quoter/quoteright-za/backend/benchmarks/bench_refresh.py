@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Benchmark getting a new access token by posting credentials to /auth/login
+against exchanging a refresh token at /auth/refresh
+
+CPU is the process time spent per request, wherever it ran, so the bcrypt
+verify on the auth worker pool counts against logins.
+
+Run from the backend directory: python benchmarks/bench_refresh.py [requests]
+"""
+
+import sys
+import time
+
+from _common import configure, percentile, run_benchmark
+
+# Keep the benchmark database away from the real one
+configure(MODEL_WARMUP="false")
+
+import httpx
+
+import main as api
+from auth import password_hasher
+from config import settings
+
+async def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+
+    # Everything runs on one loop, the async engine's connections belong to the loop that opened them
+    transport = httpx.ASGITransport(app=api.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        credentials = {"email": "bench@example.com", "password": "bench-password"}
+        refresh_token = (await client.post("/auth/register", json={
+            **credentials, "business_name": "Bench Plumbing", "industry": "plumbing",
+            "experience_level": "intermediate"})).json()["refresh_token"]
+
+        async def login():
+            return await client.post("/auth/login", json=credentials)
+
+        async def refresh():
+            nonlocal refresh_token
+            response = await client.post("/auth/refresh", json={"refresh_token": refresh_token})
+            refresh_token = response.json()["refresh_token"]
+            return response
+
+        print(f"{n} sequential token requests, bcrypt work factor {settings.BCRYPT_ROUNDS}")
+        print(f"{'endpoint':<14} {'p50':>9} {'p99':>9} {'CPU/req':>9}")
+        for label, request in (("/auth/login", login), ("/auth/refresh", refresh)):
+            latencies = []
+            cpu = time.process_time()
+            for _ in range(n):
+                start = time.perf_counter()
+                (await request()).raise_for_status()
+                latencies.append(time.perf_counter() - start)
+            cpu = time.process_time() - cpu
+            print(f"{label:<14} {percentile(latencies, 50) * 1000:>7.1f}ms {percentile(latencies, 99) * 1000:>7.1f}ms "
+                  f"{cpu / n * 1000:>7.1f}ms")
+    password_hasher.shutdown()
+
+if __name__ == "__main__":
+    run_benchmark(main)
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark quote HTML rendering: re-reading and re-compiling the template on every
+call (the old path) against the shared Jinja2 environment
+
+Run from the backend directory: python benchmarks/bench_render.py [items...]
+"""
+
+import os
+import sys
+import time
+
+from _common import configure, run_benchmark, work_path
+
+# Keep the bytecode cache away from the real one
+configure(database=None, TEMPLATE_CACHE_DIR=work_path("jinja"))
+
+from datetime import datetime, timedelta
+from jinja2 import Template
+
+from pdf_generator import PDFGenerator
+
+DURATION = 2.0
+
+def make_quote(n_items: int):
+    items = [{'description': f"Item {i}", 'quantity': i % 5 + 1, 'unit_price': 150.0 + i,
+              'total': (i % 5 + 1) * (150.0 + i)} for i in range(n_items)]
+    quote = {'id': 42, 'job_title': "Geyser replacement", 'industry': "plumbing", 'location': "johannesburg",
+             'client_info': {'name': "Jane Client", 'email': "jane@example.com", 'phone': "0820000000"},
+             'items': items, 'validity_days': 30, 'terms': "50% deposit required"}
+    user = {'business_name': "Bench Plumbing", 'logo_url': None}
+    return quote, user
+
+def render_uncached(generator: PDFGenerator, quote_data, user_data) -> str:
+    """generate_quote_html as it was: read and compile the template per call"""
+    with open(os.path.join(generator.template_dir, generator.DEFAULT_TEMPLATE), 'r') as f:
+        template = Template(f.read())
+    items = quote_data.get('items', [])
+    return template.render(quote_data={
+        'business_name': user_data.get('business_name', 'Your Business'),
+        'logo_url': user_data.get('logo_url'),
+        'quote_id': f"Q{quote_data.get('id', '0000')}",
+        'date': datetime.now().strftime('%Y-%m-%d'),
+        'valid_until': (datetime.now() + timedelta(days=quote_data.get('validity_days', 30))).strftime('%Y-%m-%d'),
+        'job_title': quote_data.get('job_title', ''),
+        'industry': quote_data.get('industry', ''),
+        'location': quote_data.get('location', ''),
+        'client': quote_data.get('client_info', {}),
+        'items': items,
+        'total': sum(item.get('total', 0) for item in items),
+        'terms': quote_data.get('terms', ''),
+    })
+
+def renders_per_sec(render, *args) -> float:
+    render(*args)
+    count, start = 0, time.perf_counter()
+    while time.perf_counter() - start < DURATION:
+        render(*args)
+        count += 1
+    return count / (time.perf_counter() - start)
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1, 10, 100]
+    generator = PDFGenerator()
+
+    quote, user = make_quote(sizes[0])
+    assert render_uncached(generator, quote, user) == generator.generate_quote_html(quote, user)
+
+    # A fresh environment that can only load compiled code from the bytecode cache
+    start = time.perf_counter()
+    PDFGenerator().get_template()
+    first_load = time.perf_counter() - start
+
+    print(f"{'items':>6} {'uncached/s':>12} {'environment/s':>14} {'speedup':>8}")
+    for n in sizes:
+        quote, user = make_quote(n)
+        before = renders_per_sec(render_uncached, generator, quote, user)
+        after = renders_per_sec(generator.generate_quote_html, quote, user)
+        print(f"{n:>6} {before:>12,.0f} {after:>14,.0f} {after / before:>7.1f}x")
+    print(f"\nFirst template load in a new worker (bytecode cache warm): {first_load * 1000:.2f} ms")
+
+if __name__ == "__main__":
+    run_benchmark(main)
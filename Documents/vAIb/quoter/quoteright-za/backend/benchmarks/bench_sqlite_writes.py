@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark concurrent write transactions per second against SQLite: the
+default rollback journal with a commit per write, the SQLite profile's
+pragmas with a commit per write, and the profile with writes group-committed
+through DatabaseWriter
+
+Each write inserts a client, as POST /clients does.
+
+Run from the backend directory: python benchmarks/bench_sqlite_writes.py [writes] [concurrency]
+"""
+
+import asyncio
+import sys
+import time
+
+from _common import configure, run_benchmark, work_path
+
+# Keep the benchmark databases away from the real one
+configure(database="app.db")
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from database import Base, Client, async_database_url, use_sqlite_profile
+from db_writer import DatabaseWriter
+
+def new_database(name: str, profile: bool):
+    """(request session factory, writer session factory) for a fresh database file"""
+    url = f"sqlite:///{work_path(name)}.db"
+    Base.metadata.create_all(create_engine(url))
+    engine = create_async_engine(async_database_url(url))
+    writer_engine = create_async_engine(async_database_url(url), pool_size=1, max_overflow=0)
+    if profile:
+        use_sqlite_profile(engine)
+        use_sqlite_profile(writer_engine, begin="BEGIN IMMEDIATE")
+    return (async_sessionmaker(engine, autoflush=False, expire_on_commit=False),
+            async_sessionmaker(writer_engine, autoflush=False, expire_on_commit=False))
+
+async def commit_each(session_factory, client: Client):
+    async with session_factory() as session:
+        session.add(client)
+        await session.commit()
+
+async def measure(label: str, write, session_factory, n: int, concurrency: int):
+    async def worker(worker_id: int):
+        errors = 0
+        for i in range(worker_id, n, concurrency):
+            try:
+                await write(Client(user_id=1, name=f"Client {i}", email=f"client{i}@example.com"))
+            except Exception:
+                errors += 1
+        return errors
+
+    start = time.perf_counter()
+    errors = sum(await asyncio.gather(*(worker(w) for w in range(concurrency))))
+    elapsed = time.perf_counter() - start
+    async with session_factory() as session:
+        stored = await session.scalar(select(func.count()).select_from(Client))
+    print(f"{label:<18} {stored / elapsed:>9.0f} {elapsed:>8.2f}s {errors:>7}")
+
+async def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    print(f"{n} writes from {concurrency} concurrent requests")
+    print(f"{'mode':<18} {'writes/s':>9} {'time':>9} {'errors':>7}")
+
+    sessions, _ = new_database("default", profile=False)
+    await measure("default", lambda client: commit_each(sessions, client), sessions, n, concurrency)
+
+    sessions, _ = new_database("profile", profile=True)
+    await measure("profile", lambda client: commit_each(sessions, client), sessions, n, concurrency)
+
+    sessions, writer_sessions = new_database("profile_writer", profile=True)
+    writer = DatabaseWriter(writer_sessions, batch_size=64)
+    await measure("profile + writer", writer.add, sessions, n, concurrency)
+    stats = writer.stats()
+    await writer.close()
+    print(f"writer committed {stats['writes']} writes in {stats['batches']} batches")
+
+if __name__ == "__main__":
+    run_benchmark(main)
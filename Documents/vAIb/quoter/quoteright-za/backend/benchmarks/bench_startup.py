@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark and guard: time `import main` with -X importtime and fail if
+the ML stack (numpy, pandas, scikit-learn) is imported before the first prediction
+
+Run from the backend directory: python benchmarks/bench_startup.py [--budget-ms N]
+"""
+
+import argparse
+import subprocess
+import sys
+
+from _common import BACKEND_DIR, configure, run_benchmark, work_path
+
+# The probes inherit these, keeping their database and model away from the real ones
+configure(database="startup.db", MODEL_PATH=work_path("pricing_model.pkl"),
+          MODEL_ARTIFACT_PATH=work_path("pricing_model.forest"), MODEL_WARMUP="false")
+
+HEAVY_MODULES = ['numpy', 'pandas', 'sklearn']
+
+PROBE = """
+import sys, time
+start = time.perf_counter()
+import main
+imported = time.perf_counter() - start
+heavy = [name for name in %r if name in sys.modules]
+start = time.perf_counter()
+main.get_pricing_model()
+first_model = time.perf_counter() - start
+print(imported, first_model, ','.join(heavy))
+""" % (HEAVY_MODULES,)
+
+def parse_importtime(stderr: str):
+    """(module, cumulative_us) pairs from -X importtime output"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, self_us, cumulative_us, name = [part.strip() for part in line.replace('import time:', '|', 1).split('|')]
+        rows.append((name.strip(), int(cumulative_us)))
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--budget-ms', type=float, default=None, help="fail if `import main` takes longer")
+    args = parser.parse_args()
+
+    trace = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import main'],
+                           cwd=BACKEND_DIR, capture_output=True, text=True, check=True)
+    probe = subprocess.run([sys.executable, '-c', PROBE],
+                           cwd=BACKEND_DIR, capture_output=True, text=True, check=True)
+
+    rows = parse_importtime(trace.stderr)
+    top_level = sorted((row for row in rows if '.' not in row[0]), key=lambda row: -row[1])[:10]
+    print("Slowest top-level imports under `import main` (cumulative):")
+    for name, cumulative_us in top_level:
+        print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+
+    # The model prints its own load message, the probe's result is the last line
+    imported, first_model, *heavy = probe.stdout.strip().splitlines()[-1].split()
+    imported_ms = float(imported) * 1000
+    print(f"\n{'import main:':<25}{imported_ms:8.1f} ms")
+    print(f"{'first get_pricing_model:':<25}{float(first_model) * 1000:8.1f} ms")
+
+    failures = []
+    if heavy:
+        failures.append(f"ML modules imported at startup: {heavy[0]}")
+    if args.budget_ms is not None and imported_ms > args.budget_ms:
+        failures.append(f"import main took {imported_ms:.1f} ms, budget is {args.budget_ms:.1f} ms")
+    for failure in failures:
+        print(f"❌ {failure}")
+    if failures:
+        sys.exit(1)
+    print("✅ Startup stays clear of the ML stack")
+
+if __name__ == "__main__":
+    run_benchmark(main)
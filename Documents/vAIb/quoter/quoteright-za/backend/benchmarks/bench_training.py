@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Benchmark forest fit time against core count and dataset size
+
+Run from the backend directory: python benchmarks/bench_training.py [sizes...]
+"""
+
+import os
+import sys
+import time
+
+from _common import run_benchmark
+
+from ai_model import PricingModel, fit_pricing_model
+from bench_predict import make_rows
+from config import settings
+
+WARM_START_ROWS = 1_000
+
+def make_training(n: int, seed: int = 0):
+    rows = make_rows(n, seed=seed)
+    model = PricingModel()
+    for row in rows:
+        low, high = model.rule_based_pricing(row['industry'], row['location'], row['experience_level'],
+                                             row['complexity'], row['duration_hours'])
+        row['final_price'] = (low + high) / 2
+    return rows
+
+def timed_fit(training, model=None, label_encoders=None):
+    start = time.perf_counter()
+    result = fit_pricing_model(training, model, label_encoders or {})
+    return time.perf_counter() - start, result
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000]
+    cores = sorted({1, 2, 4, os.cpu_count() or 1})
+    print(f"{settings.MODEL_N_ESTIMATORS} trees, max_depth={settings.MODEL_MAX_DEPTH}, "
+          f"{os.cpu_count()} cores available")
+
+    print(f"\n{'rows':>8} " + " ".join(f"{f'n_jobs={n}':>10}" for n in cores))
+    for n in sizes:
+        training = make_training(n)
+        times = []
+        for n_jobs in cores:
+            settings.MODEL_N_JOBS = n_jobs
+            elapsed, _ = timed_fit(training)
+            times.append(elapsed)
+        print(f"{n:>8} " + " ".join(f"{t:>9.2f}s" for t in times))
+
+    settings.MODEL_N_JOBS = -1
+    print(f"\nAdding {WARM_START_ROWS:,} rows (n_jobs=-1)")
+    new_rows = make_training(WARM_START_ROWS, seed=1)
+    for n in sizes:
+        training = make_training(n)
+        settings.MODEL_WARM_START = False
+        _, (model, label_encoders) = timed_fit(training)
+        refit, _ = timed_fit(training + new_rows)
+        settings.MODEL_WARM_START = True
+        warm, _ = timed_fit(new_rows, model, label_encoders)
+        print(f"{n:>8} rows: full refit {refit:.2f}s, warm start "
+              f"+{settings.MODEL_WARM_START_TREES} trees {warm:.2f}s")
+
+if __name__ == "__main__":
+    run_benchmark(main)
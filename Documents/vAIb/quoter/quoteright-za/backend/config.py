@@ -1,4 +1,5 @@
 import os
+from typing import Optional
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -6,14 +7,73 @@ load_dotenv()
 class Settings:
     # Database Configuration
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./quoteright.db")
+    ASYNC_DATABASE_URL: str = os.getenv("ASYNC_DATABASE_URL", "")  # empty uses DATABASE_URL with its async driver
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-here-change-in-production")
     ALGORITHM: str = os.getenv("ALGORITHM", "HS256")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+    REFRESH_TOKEN_EXPIRE_DAYS: int = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "30"))  # each refresh issues a new one
+    TOKEN_CACHE_SIZE: int = int(os.getenv("TOKEN_CACHE_SIZE", "4096"))  # verified tokens kept, 0 disables
+    
+    # Password Hashing
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", "12"))  # work factor, older hashes are upgraded at login
+    PASSWORD_EXECUTOR: str = os.getenv("PASSWORD_EXECUTOR", "thread")  # thread or process
+    PASSWORD_WORKERS: int = int(os.getenv("PASSWORD_WORKERS", "2"))  # hashes computed at once
+    PASSWORD_MAX_PENDING: int = int(os.getenv("PASSWORD_MAX_PENDING", "64"))  # queued or running before logins get 503
+    
+    # Connection Pool (in-memory SQLite uses a single connection instead)
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))  # connections kept open
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))  # extra connections opened under load
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))  # seconds to wait for a connection
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # seconds before a connection is replaced, -1 never
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"  # test connections on checkout, not for SQLite
+    DB_STATEMENT_TIMEOUT: int = int(os.getenv("DB_STATEMENT_TIMEOUT", "0"))  # ms, PostgreSQL only, 0 disables
+    DB_SLOW_CHECKOUT_MS: float = float(os.getenv("DB_SLOW_CHECKOUT_MS", "100"))  # checkout waits logged as slow
+    
+    # SQLite Profile (only applies when DATABASE_URL is SQLite)
+    SQLITE_PROFILE: bool = os.getenv("SQLITE_PROFILE", "true").lower() == "true"  # WAL, tuned pragmas and the single writer
+    SQLITE_SYNCHRONOUS: str = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")  # NORMAL only syncs the WAL at checkpoints
+    SQLITE_MMAP_SIZE: int = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))  # bytes read through mmap
+    SQLITE_CACHE_SIZE: int = int(os.getenv("SQLITE_CACHE_SIZE", "-65536"))  # negative is KiB, so 64 MiB per connection
+    SQLITE_BUSY_TIMEOUT: int = int(os.getenv("SQLITE_BUSY_TIMEOUT", "5000"))  # ms to wait for a lock before failing
+    SQLITE_WRITE_BATCH: int = int(os.getenv("SQLITE_WRITE_BATCH", "64"))  # most writes group-committed together
     
     # AI Model Configuration
     MODEL_PATH: str = os.getenv("MODEL_PATH", "./models/pricing_model.pkl")
+    MODEL_ARTIFACT_PATH: str = os.getenv("MODEL_ARTIFACT_PATH", "./models/pricing_model.forest")
+    MODEL_WARMUP: bool = os.getenv("MODEL_WARMUP", "true").lower() == "true"
     DATA_PATH: str = os.getenv("DATA_PATH", "./data/")
     
+    # Model Training Configuration
+    MODEL_N_ESTIMATORS: int = int(os.getenv("MODEL_N_ESTIMATORS", "100"))
+    MODEL_MAX_DEPTH: Optional[int] = int(os.getenv("MODEL_MAX_DEPTH")) if os.getenv("MODEL_MAX_DEPTH") else None
+    MODEL_N_JOBS: int = int(os.getenv("MODEL_N_JOBS", "1"))  # -1 uses every core
+    MODEL_WARM_START: bool = os.getenv("MODEL_WARM_START", "false").lower() == "true"
+    MODEL_WARM_START_TREES: int = int(os.getenv("MODEL_WARM_START_TREES", "20"))
+    MODEL_MAX_ESTIMATORS: int = int(os.getenv("MODEL_MAX_ESTIMATORS", "500"))
+    
+    # Quote Rendering
+    TEMPLATE_CACHE_DIR: str = os.getenv("TEMPLATE_CACHE_DIR", "")  # empty uses the system temp dir
+    TEMPLATE_AUTO_RELOAD: bool = os.getenv("TEMPLATE_AUTO_RELOAD", "true").lower() == "true"
+    DOCUMENT_FORMAT: str = os.getenv("DOCUMENT_FORMAT", "pdf")  # pdf, or html to serve the tenant's HTML template
+    PDF_FONT_PATH: str = os.getenv("PDF_FONT_PATH", "")  # TrueType font, empty uses Helvetica
+    PDF_BOLD_FONT_PATH: str = os.getenv("PDF_BOLD_FONT_PATH", "")
+    DOCUMENT_CACHE_DIR: str = os.getenv("DOCUMENT_CACHE_DIR", "")  # empty uses UPLOAD_DIR/documents
+    DOCUMENT_CACHE_MAX_BYTES: int = int(os.getenv("DOCUMENT_CACHE_MAX_BYTES", str(1024 * 1024 * 1024)))
+    DOCUMENT_CACHE_CONTROL: str = os.getenv("DOCUMENT_CACHE_CONTROL", "private, no-cache")  # clients revalidate with If-None-Match
+    EXPORT_BATCH_SIZE: int = int(os.getenv("EXPORT_BATCH_SIZE", "200"))  # quote rows fetched per round trip
+    EXPORT_RENDER_WINDOW: int = int(os.getenv("EXPORT_RENDER_WINDOW", "8"))  # documents rendered ahead of the stream
+    DOCUMENT_EXECUTOR: str = os.getenv("DOCUMENT_EXECUTOR", "thread")  # thread or process
+    DOCUMENT_WORKERS: int = int(os.getenv("DOCUMENT_WORKERS", "2"))
+    DOCUMENT_MAX_ATTEMPTS: int = int(os.getenv("DOCUMENT_MAX_ATTEMPTS", "3"))  # renders of a document before its failure is final
+    
+    # Usage Quotas
+    QUOTE_LIMITS: str = os.getenv("QUOTE_LIMITS", "free=2")  # tier=limit pairs, unlisted tiers are unlimited
+    QUOTE_LIMIT_PERIOD: str = os.getenv("QUOTE_LIMIT_PERIOD", "none")  # none, day or month
+    
+    # User Cache
+    USER_CACHE_SIZE: int = int(os.getenv("USER_CACHE_SIZE", "1024"))  # users kept for authentication
+    USER_CACHE_TTL: float = float(os.getenv("USER_CACHE_TTL", "60"))  # seconds before a user is re-read
+    
     # External APIs
     PAYSTACK_SECRET_KEY: str = os.getenv("PAYSTACK_SECRET_KEY", "")
     PAYSTACK_PUBLIC_KEY: str = os.getenv("PAYSTACK_PUBLIC_KEY", "")
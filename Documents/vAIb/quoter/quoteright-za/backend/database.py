@@ -1,11 +1,96 @@
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Boolean, Text, ForeignKey
+from sqlalchemy import create_engine, event, Column, Integer, String, Float, DateTime, Boolean, Text, ForeignKey, Index, UniqueConstraint
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 from datetime import datetime
 from config import settings
+from db_metrics import InstrumentedAsyncPool, InstrumentedQueuePool
 
-engine = create_engine(settings.DATABASE_URL, connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {})
+# Async drivers for each database, used when ASYNC_DATABASE_URL isn't set
+ASYNC_DRIVERS = {"sqlite": "aiosqlite", "postgresql": "asyncpg", "postgres": "asyncpg"}
+
+def async_database_url(url: str) -> str:
+    """DATABASE_URL with its driver swapped for the async one, e.g. sqlite:// -> sqlite+aiosqlite://"""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        return url
+    # postgres:// is an old alias SQLAlchemy no longer accepts
+    backend = "postgresql" if backend == "postgres" else backend
+    return parsed.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}").render_as_string(hide_password=False)
+
+def use_sqlite_profile(engine, begin: str = "BEGIN"):
+    """Set up an SQLite engine for concurrent use: WAL, fewer fsyncs, a bigger page cache and mmap reads
+
+    Transactions are started with an explicit begin statement instead of
+    being left to pysqlite, which otherwise mishandles SAVEPOINTs and can't
+    take the write lock up front with BEGIN IMMEDIATE.
+    """
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(sync_engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE}")
+        cursor.execute(f"PRAGMA cache_size={settings.SQLITE_CACHE_SIZE}")
+        cursor.execute(f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT}")
+        cursor.close()
+
+    @event.listens_for(sync_engine, "begin")
+    def begin_transaction(connection):
+        connection.exec_driver_sql(begin)
+
+def pool_options(url: str, poolclass) -> dict:
+    """create_engine() arguments for the pool settings and statement timeout"""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend == "sqlite" and parsed.database in (None, "", ":memory:"):
+        # An in-memory database lives in one connection, so it keeps SQLAlchemy's default pool
+        return {"connect_args": {"check_same_thread": False}}
+    options = {
+        "poolclass": poolclass,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        # A file on local disk can't drop the connection, so SQLite skips the extra round trip
+        "pool_pre_ping": settings.DB_POOL_PRE_PING and backend != "sqlite",
+    }
+    if backend == "sqlite":
+        options["connect_args"] = {"check_same_thread": False}
+    elif backend == "postgresql" and settings.DB_STATEMENT_TIMEOUT:
+        if parsed.get_driver_name() == "asyncpg":
+            options["connect_args"] = {"server_settings": {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT)}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT}"}
+    return options
+
+SQLITE_PROFILE = settings.SQLITE_PROFILE and make_url(settings.DATABASE_URL).get_backend_name() == "sqlite"
+
+# Blocking engine for worker threads, scripts and streaming exports
+engine = create_engine(settings.DATABASE_URL, **pool_options(settings.DATABASE_URL, InstrumentedQueuePool))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Async engine for request handlers, so queries don't block the event loop
+ASYNC_URL = settings.ASYNC_DATABASE_URL or async_database_url(settings.DATABASE_URL)
+async_engine = create_async_engine(ASYNC_URL, **pool_options(ASYNC_URL, InstrumentedAsyncPool))
+# Nothing is expired on commit, since reloading it lazily would need a blocking query
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+# With the SQLite profile, the requests' writes go through db_writer on a
+# connection of their own, which takes the write lock as soon as it begins
+writer_engine = None
+WriterSessionLocal = None
+if SQLITE_PROFILE:
+    use_sqlite_profile(engine)
+    use_sqlite_profile(async_engine)
+    writer_engine = create_async_engine(ASYNC_URL, pool_size=1, max_overflow=0)
+    use_sqlite_profile(writer_engine, begin="BEGIN IMMEDIATE")
+    WriterSessionLocal = async_sessionmaker(writer_engine, autoflush=False, expire_on_commit=False)
 Base = declarative_base()
 
 class User(Base):
@@ -40,6 +125,11 @@ class Client(Base):
     
     user = relationship("User", back_populates="clients")
     quotes = relationship("Quote", back_populates="client")
+    
+    __table_args__ = (
+        # Keyset pagination of a user's clients, newest first
+        Index("ix_clients_user_created_id", "user_id", "created_at", "id"),
+    )
 
 class Quote(Base):
     __tablename__ = "quotes"
@@ -63,6 +153,55 @@ class Quote(Base):
     
     user = relationship("User", back_populates="quotes")
     client = relationship("Client", back_populates="quotes")
+    items = relationship("QuoteItem", back_populates="quote", order_by="QuoteItem.position")
+    
+    __table_args__ = (
+        # Keyset pagination of a user's quotes, newest first, optionally narrowed
+        # to one status or industry without scanning the user's other quotes
+        Index("ix_quotes_user_created_id", "user_id", "created_at", "id"),
+        Index("ix_quotes_user_status_created_id", "user_id", "status", "created_at", "id"),
+        Index("ix_quotes_user_industry_created_id", "user_id", "industry", "created_at", "id"),
+    )
+
+class QuoteItem(Base):
+    __tablename__ = "quote_items"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    quote_id = Column(Integer, ForeignKey("quotes.id"), nullable=False, index=True)
+    position = Column(Integer, nullable=False)  # order within the quote
+    description = Column(String)
+    quantity = Column(Float)
+    unit_price = Column(Float)
+    total = Column(Float)
+    
+    quote = relationship("Quote", back_populates="items")
+    
+    __table_args__ = (
+        Index("ix_quote_items_description", "description"),
+    )
+
+class UsageCounter(Base):
+    __tablename__ = "usage_counters"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    resource = Column(String, nullable=False)  # e.g. quotes
+    period_start = Column(DateTime, nullable=False)  # start of the period used counts
+    used = Column(Integer, nullable=False, default=0)
+    
+    __table_args__ = (
+        UniqueConstraint("user_id", "resource", name="uq_usage_counters_user_resource"),
+    )
+
+class RefreshToken(Base):
+    __tablename__ = "refresh_tokens"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    token_hash = Column(String, unique=True, nullable=False)  # SHA-256 of the token, which is never stored
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False)
+    revoked_at = Column(DateTime, nullable=True)  # set once the token is used or revoked
 
 class PricingData(Base):
     __tablename__ = "pricing_data"
@@ -78,12 +217,14 @@ class PricingData(Base):
     sample_size = Column(Integer)
     last_updated = Column(DateTime, default=datetime.utcnow)
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 # Create tables
-Base.metadata.create_all(bind=engine) 
\ No newline at end of file
+Base.metadata.create_all(bind=engine)
+
+# create_all only adds indexes along with new tables, so add any missing ones to existing databases
+for table in Base.metadata.sorted_tables:
+    for index in table.indexes:
+        index.create(bind=engine, checkfirst=True) 
\ No newline at end of file
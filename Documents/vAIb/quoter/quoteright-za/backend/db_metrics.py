@@ -0,0 +1,108 @@
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from config import settings
+
+class RequestDBUsage:
+    """Connection checkouts made while handling one request"""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.wait = 0.0
+        self.max_in_use = 0
+
+# The current request's usage, None outside a request
+request_db_usage: ContextVar[Optional[RequestDBUsage]] = ContextVar("request_db_usage", default=None)
+
+class PoolMetrics:
+    """Checkout counts and waits for one pool, across every request"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.slow_checkouts = 0
+
+    def record(self, wait: float, in_use: int):
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            if wait * 1000 >= settings.DB_SLOW_CHECKOUT_MS:
+                self.slow_checkouts += 1
+        usage = request_db_usage.get()
+        if usage is not None:
+            usage.checkouts += 1
+            usage.wait += wait
+            usage.max_in_use = max(usage.max_in_use, in_use)
+
+    def stats(self, pool) -> Dict:
+        with self._lock:
+            return {
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "overflow": max(pool.overflow(), 0),
+                "checkouts": self.checkouts,
+                "average_wait_ms": self.total_wait / self.checkouts * 1000 if self.checkouts else 0.0,
+                "max_wait_ms": self.max_wait * 1000,
+                "slow_checkouts": self.slow_checkouts,
+            }
+
+class _TimedCheckout:
+    """Pool mixin timing how long each checkout waited for a connection"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        connection = super()._do_get()
+        self.metrics.record(time.perf_counter() - start, self.checkedout())
+        return connection
+
+    def usage_stats(self) -> Dict:
+        return self.metrics.stats(self)
+
+class InstrumentedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+class InstrumentedAsyncPool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
+
+class DBUsageMiddleware:
+    """Reports each request's connection checkouts in a Server-Timing header
+
+    Written as plain ASGI so the usage context is set in the same task the
+    endpoint and its dependencies run in.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        usage = RequestDBUsage()
+        token = request_db_usage.set(usage)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start" and usage.checkouts:
+                timing = (f"db-wait;dur={usage.wait * 1000:.2f}, db-checkouts;desc={usage.checkouts}, "
+                          f"db-in-use;desc={usage.max_in_use}")
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"server-timing", timing.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            request_db_usage.reset(token)
+            if usage.wait * 1000 >= settings.DB_SLOW_CHECKOUT_MS:
+                print(f"Slow connection checkout: {scope['method']} {scope['path']} waited {usage.wait * 1000:.0f}ms")
@@ -0,0 +1,116 @@
+import asyncio
+import contextvars
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from database import AsyncSessionLocal, WriterSessionLocal
+
+Work = Callable[[AsyncSession], Awaitable[Any]]
+
+class DatabaseWriter:
+    """Runs request writes on one connection, committing whatever is queued together
+
+    SQLite allows a single writer at a time, so many request sessions writing
+    at once only queue up on the file lock, each paying for its own commit.
+    Here callers hand over a unit of work instead, and a single task runs all
+    the units waiting at that moment in one transaction, each in its own
+    SAVEPOINT so a failing unit only undoes itself, then commits once.
+
+    Without a session factory (any database other than SQLite) run() just
+    executes the work in a fresh session and commits it.
+    """
+
+    def __init__(self, session_factory=None, batch_size: int = 64):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self.batches = self.writes = 0
+
+    def _start(self):
+        # The queue and task belong to the running loop, a new loop gets its own
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.get_loop() is not loop or self._task.done():
+            self._queue = asyncio.Queue()
+            # A context of its own, so nothing the writer does is counted against the request that started it
+            self._task = loop.create_task(self._write_batches(), context=contextvars.Context())
+
+    async def run(self, work: Work) -> Any:
+        """Run work(session) in a write transaction and return its result once committed"""
+        if self.session_factory is None:
+            async with AsyncSessionLocal() as session:
+                result = await work(session)
+                await session.commit()
+                return result
+
+        self._start()
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((work, future))
+        return await future
+
+    async def add(self, instance):
+        """Insert instance and return it with its generated columns filled in"""
+        async def insert(session: AsyncSession):
+            session.add(instance)
+            await session.flush()
+            return instance
+        return await self.run(insert)
+
+    async def _write_batches(self):
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                await self._commit(batch)
+            except Exception as e:
+                print(f"Error committing write batch: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    async def _commit(self, batch):
+        done = []
+        async with self.session_factory() as session:
+            for work, future in batch:
+                # The request went away while it was queued
+                if future.cancelled():
+                    continue
+                try:
+                    async with session.begin_nested():
+                        result = await work(session)
+                except Exception as e:
+                    # Cancelled while its unit ran, nothing is waiting for the error
+                    if not future.done():
+                        future.set_exception(e)
+                    continue
+                done.append((future, result))
+            await session.commit()
+
+        self.batches += 1
+        self.writes += len(done)
+        for future, result in done:
+            if not future.done():
+                future.set_result(result)
+
+    async def close(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    def stats(self) -> Dict:
+        return {
+            "group_commit": self.session_factory is not None,
+            "batches": self.batches,
+            "writes": self.writes,
+            "average_batch": self.writes / self.batches if self.batches else 0.0,
+        }
+
+# Global database writer instance
+db_writer = DatabaseWriter(WriterSessionLocal, settings.SQLITE_WRITE_BATCH)
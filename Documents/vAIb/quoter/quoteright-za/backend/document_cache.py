@@ -0,0 +1,100 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Optional, Union
+
+from config import settings
+
+class DocumentCache:
+    """Content-addressed store for rendered quote documents
+
+    A document lives at <directory>/<sha256 of its inputs>.<extension>, so
+    rendering the same quote with the same branding and template again finds
+    the existing file instead of writing a duplicate. Hits refresh the file's
+    mtime, and once the directory grows past max_bytes the least recently used
+    documents are deleted down to 90% of the limit. Only this directory is ever
+    evicted from, other uploads are left alone.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = os.path.abspath(directory)
+        self.max_bytes = max_bytes
+        self._size = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(*inputs) -> str:
+        """Hash of everything that goes into a render"""
+        payload = json.dumps(inputs, sort_keys=True, default=str, separators=(',', ':'))
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def path_for(self, key: str, extension: str) -> str:
+        return os.path.join(self.directory, f"{key}.{extension}")
+
+    def get(self, key: str, extension: str) -> Optional[str]:
+        """Path of a cached document, marking it recently used"""
+        path = self.path_for(key, extension)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def put(self, key: str, extension: str, content: Union[str, bytes]) -> str:
+        """Store a rendered document and return its path"""
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path_for(key, extension)
+        data = content.encode('utf-8') if isinstance(content, str) else content
+
+        # Write beside the target and rename, so readers never see a partial file
+        # and two workers rendering the same document just replace one another
+        tmp_path = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            if self._size is None:
+                self._size = self._scan_size()
+            else:
+                self._size += len(data)
+            if self._size > self.max_bytes:
+                self._evict(keep=path)
+        return path
+
+    def _entries(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and '.tmp-' not in entry.name:
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def _scan_size(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self, keep: str):
+        """Delete least recently used documents until under 90% of max_bytes"""
+        # Rescan rather than trust the running total, other processes share the directory
+        entries = sorted(self._entries())
+        size = sum(entry[1] for entry in entries)
+        target = self.max_bytes * 0.9
+        for _, entry_size, path in entries:
+            if size <= target:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            size -= entry_size
+        self._size = size
+
+# Global document cache
+document_cache = DocumentCache(settings.DOCUMENT_CACHE_DIR or os.path.join(settings.UPLOAD_DIR, "documents"),
+                               settings.DOCUMENT_CACHE_MAX_BYTES)
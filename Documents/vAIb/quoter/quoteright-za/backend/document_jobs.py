@@ -0,0 +1,145 @@
+import json
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, UTC
+from typing import Dict, Optional
+
+from config import settings
+
+def quote_document_data(quote, details: Dict = None, client=None) -> Dict:
+    """Plain data a quote's document is rendered from
+
+    details and client can be passed by callers that already have them,
+    otherwise details are read back from the stored quote.
+    """
+    from schemas import Client
+    
+    if details is None:
+        details = json.loads(quote.quote_data or "{}")
+    return {
+        "id": quote.id,
+        "job_title": quote.job_title,
+        "industry": quote.industry,
+        "location": quote.location,
+        "created_at": quote.created_at.isoformat() if quote.created_at else None,
+        "items": details.get("items", []),
+        "terms": details.get("terms"),
+        "validity_days": details.get("validity_days", 30),
+        "client_info": Client.model_validate(client).model_dump() if client else {}
+    }
+
+def user_branding(user) -> Dict:
+    """The business details printed on a user's documents"""
+    return {
+        "business_name": user.business_name,
+        "logo_url": user.logo_url
+    }
+
+def render_quote_document(quote_data: Dict, user_data: Dict, quote_id: int, tenant: Optional[str] = None) -> str:
+    """Render and save one quote document, returning its path
+
+    Runs inside the pool, so it only takes plain data and never a DB session.
+    """
+    from pdf_generator import pdf_generator
+    if settings.DOCUMENT_FORMAT == "html":
+        return pdf_generator.save_quote_html(quote_data, user_data, quote_id, tenant=tenant)
+    return pdf_generator.save_quote_pdf(quote_data, user_data, quote_id)
+
+class DocumentJobQueue:
+    """Quote document generation off the request path
+
+    POST /quotes hands the quote's data to submit() and returns straight away.
+    Rendering and the file write happen on a thread or process pool
+    (DOCUMENT_EXECUTOR); when a job completes the quote's pdf_url is set, so a
+    quote without pdf_url is pending unless its job has failed. A failed job is
+    submitted again when its document is next asked for, up to max_attempts
+    renders in all.
+    """
+
+    def __init__(self, max_failures: int = 1000, max_attempts: int = 3):
+        self.max_failures = max_failures
+        self.max_attempts = max_attempts
+        self._jobs: "OrderedDict[int, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._pool = None
+
+    def _executor(self):
+        with self._lock:
+            if self._pool is None:
+                if settings.DOCUMENT_EXECUTOR == "process":
+                    self._pool = ProcessPoolExecutor(max_workers=settings.DOCUMENT_WORKERS)
+                else:
+                    self._pool = ThreadPoolExecutor(max_workers=settings.DOCUMENT_WORKERS,
+                                                    thread_name_prefix="quote-documents")
+            return self._pool
+
+    def submit(self, quote_id: int, quote_data: Dict, user_data: Dict, tenant: Optional[str] = None) -> Dict:
+        """Queue a quote's document, unless one is already on its way"""
+        with self._lock:
+            job = self._jobs.get(quote_id)
+            if job and job["status"] == "pending":
+                return dict(job)
+            # A retry carries on counting the failed job's attempts
+            attempts = job["attempts"] + 1 if job else 1
+            job = {"quote_id": quote_id, "status": "pending", "error": None, "attempts": attempts,
+                   "submitted_at": datetime.now(UTC)}
+            self._jobs[quote_id] = job
+            self._jobs.move_to_end(quote_id)
+
+        future = self.render(quote_id, quote_data, user_data, tenant)
+        future.add_done_callback(lambda f: self._finish(quote_id, f))
+        return dict(job)
+
+    def render(self, quote_id: int, quote_data: Dict, user_data: Dict, tenant: Optional[str] = None) -> Future:
+        """Render a document on the pool without tracking it as a job"""
+        return self._executor().submit(render_quote_document, quote_data, user_data, quote_id, tenant)
+    
+    def get(self, quote_id: int) -> Optional[Dict]:
+        with self._lock:
+            job = self._jobs.get(quote_id)
+            return dict(job) if job else None
+
+    def can_retry(self, job: Dict) -> bool:
+        """Whether a failed job has attempts left"""
+        return job["status"] == "failed" and job["attempts"] < self.max_attempts
+
+    def _finish(self, quote_id: int, future):
+        from database import SessionLocal, Quote
+
+        try:
+            pdf_path = future.result()
+            db = SessionLocal()
+            try:
+                db.query(Quote).filter(Quote.id == quote_id).update({Quote.pdf_url: pdf_path})
+                db.commit()
+            finally:
+                db.close()
+        except Exception as e:
+            with self._lock:
+                if quote_id in self._jobs:
+                    self._jobs[quote_id].update(status="failed", error=str(e))
+                self._trim()
+            print(f"Document for quote {quote_id} failed: {e}")
+            return
+
+        # pdf_url is the record of a finished document, the job can go
+        with self._lock:
+            self._jobs.pop(quote_id, None)
+
+    def _trim(self):
+        """Forget the oldest failures beyond max_failures"""
+        for quote_id in list(self._jobs):
+            if len(self._jobs) <= self.max_failures:
+                break
+            if self._jobs[quote_id]["status"] == "failed":
+                del self._jobs[quote_id]
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+# Global document job queue
+document_jobs = DocumentJobQueue(max_attempts=settings.DOCUMENT_MAX_ATTEMPTS)
@@ -0,0 +1,102 @@
+import os
+from typing import Optional, Tuple
+
+import aiofiles
+from fastapi import Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
+
+from config import settings
+
+CHUNK_SIZE = 64 * 1024
+MEDIA_TYPES = {".pdf": "application/pdf", ".html": "text/html; charset=utf-8"}
+
+def document_etag(path: str, stat: os.stat_result) -> str:
+    """Strong ETag for a stored document
+
+    Cached documents are named by the hash of their inputs, which makes the name
+    itself the validator; anything else falls back to mtime and size.
+    """
+    name = os.path.splitext(os.path.basename(path))[0]
+    if len(name) == 64 and all(c in "0123456789abcdef" for c in name):
+        return f'"{name}"'
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return etag in (tag.strip().removeprefix("W/") for tag in header.split(","))
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """Inclusive (start, end) of a single byte range, or None to send the whole file
+
+    Raises ValueError when the range can't be satisfied. Multiple ranges are
+    answered with the whole file, which RFC 9110 allows.
+    """
+    unit, _, ranges = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in ranges:
+        return None
+    start, sep, end = [part.strip() for part in ranges.partition("-")]
+    # Malformed ranges are ignored rather than refused
+    if not sep or not (start + end).isdigit():
+        return None
+    if not start:
+        # bytes=-N is the last N bytes
+        if int(end) == 0:
+            raise ValueError("Empty suffix range")
+        return max(0, size - int(end)), size - 1
+    start, end = int(start), int(end) if end else size - 1
+    if end < start:
+        return None
+    if start >= size:
+        raise ValueError("Range not satisfiable")
+    return start, min(end, size - 1)
+
+async def file_chunks(path: str, start: int, length: int):
+    async with aiofiles.open(path, "rb") as f:
+        await f.seek(start)
+        while length > 0:
+            chunk = await f.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+def document_response(request: Request, path: str, filename: str) -> Response:
+    """Serve a stored document with conditional and range request support
+
+    The file is streamed from disk in chunks, never read into memory whole.
+    """
+    stat = os.stat(path)
+    etag = document_etag(path, stat)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": settings.DOCUMENT_CACHE_CONTROL,
+        "Accept-Ranges": "bytes",
+    }
+
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    media_type = MEDIA_TYPES.get(os.path.splitext(path)[1], "application/octet-stream")
+    byte_range = None
+    range_header = request.headers.get("range")
+    # A Range with an outdated If-Range gets the whole, current document
+    if range_header and (not request.headers.get("if-range") or request.headers["if-range"].strip() == etag):
+        try:
+            byte_range = parse_range(range_header, stat.st_size)
+        except ValueError:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{stat.st_size}"})
+
+    if byte_range is None:
+        return FileResponse(path, media_type=media_type, filename=filename, headers=headers, stat_result=stat)
+
+    start, end = byte_range
+    length = end - start + 1
+    headers.update({
+        "Content-Range": f"bytes {start}-{end}/{stat.st_size}",
+        "Content-Length": str(length),
+        "Content-Disposition": f'attachment; filename="{filename}"',
+    })
+    return StreamingResponse(file_chunks(path, start, length), status_code=206, media_type=media_type, headers=headers)
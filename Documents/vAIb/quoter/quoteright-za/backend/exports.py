@@ -0,0 +1,140 @@
+import csv
+import io
+import json
+import os
+import zipfile
+from collections import deque
+from typing import Dict, Iterator, List, Optional
+
+from sqlalchemy import and_
+from sqlalchemy.orm import load_only
+
+from config import settings
+from database import SessionLocal, Client, Quote
+from document_jobs import document_jobs, quote_document_data
+
+CHUNK_SIZE = 64 * 1024
+CSV_COLUMNS = [
+    "id", "created_at", "status", "job_title", "industry", "location", "experience_level",
+    "duration", "client_id", "client_name", "ai_recommendation_min", "ai_recommendation_max",
+    "final_price", "expires_at",
+]
+
+def quote_rows(user_id: int, columns: Optional[List[str]] = None):
+    """A user's quotes with their client, read in batches of EXPORT_BATCH_SIZE
+
+    columns limits which quote columns are selected. The export runs after the
+    request's own session has closed, so it opens one for as long as the
+    response is streaming.
+    """
+    db = SessionLocal()
+    try:
+        query = (db.query(Quote, Client)
+                 .outerjoin(Client, and_(Client.id == Quote.client_id, Client.user_id == Quote.user_id))
+                 .filter(Quote.user_id == user_id)
+                 .order_by(Quote.id)
+                 .yield_per(settings.EXPORT_BATCH_SIZE))
+        if columns:
+            query = query.options(load_only(*(getattr(Quote, column) for column in columns)))
+        for quote, client in query:
+            yield quote, client
+    finally:
+        db.close()
+
+def quote_record(quote, client) -> Dict:
+    record = {column: getattr(quote, column, None) for column in CSV_COLUMNS}
+    record["client_name"] = client.name if client else None
+    return record
+
+def export_csv(user_id: int) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CSV_COLUMNS)
+    writer.writeheader()
+    # The CSV has no use for the quote_data blob, so it is never selected
+    for quote, client in quote_rows(user_id, [column for column in CSV_COLUMNS if column != "client_name"]):
+        writer.writerow(quote_record(quote, client))
+        # Hand rows over roughly a chunk at a time rather than one tiny write each
+        if buffer.tell() >= CHUNK_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+def export_jsonl(user_id: int) -> Iterator[str]:
+    for quote, client in quote_rows(user_id):
+        record = quote_record(quote, client)
+        record["quote_data"] = json.loads(quote.quote_data or "{}")
+        yield json.dumps(record, default=str) + "\n"
+
+class _ZipStream:
+    """Write-only file zipfile writes into, emptied by the generator as it goes
+
+    It has no tell() or seek(), which makes zipfile stream each entry with a
+    data descriptor instead of seeking back to patch its header.
+    """
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+def quote_documents(user_id: int, user_data: Dict):
+    """(quote, document path or exception) for each of a user's quotes, in order
+
+    Quotes whose document is already on disk use it; the rest are rendered on
+    the document pool. At most EXPORT_RENDER_WINDOW renders are in flight, so
+    memory doesn't grow with the number of quotes.
+    """
+    in_flight = deque()
+
+    def resolve(entry):
+        quote, future, path = entry
+        if future is None:
+            return quote, path
+        try:
+            return quote, future.result()
+        except Exception as e:
+            return quote, e
+
+    for quote, client in quote_rows(user_id):
+        if quote.pdf_url and os.path.exists(quote.pdf_url):
+            in_flight.append((quote, None, quote.pdf_url))
+        else:
+            future = document_jobs.render(quote.id, quote_document_data(quote, client=client), user_data, str(user_id))
+            in_flight.append((quote, future, None))
+        if len(in_flight) > settings.EXPORT_RENDER_WINDOW:
+            yield resolve(in_flight.popleft())
+    while in_flight:
+        yield resolve(in_flight.popleft())
+
+def export_zip(user_id: int, user_data: Dict) -> Iterator[bytes]:
+    stream = _ZipStream()
+    errors = []
+    # Documents are PDFs, already compressed, so entries are stored as they are
+    with zipfile.ZipFile(stream, mode="w", compression=zipfile.ZIP_STORED) as archive:
+        for quote, document in quote_documents(user_id, user_data):
+            if isinstance(document, Exception):
+                errors.append(f"quote {quote.id}: {document}")
+                continue
+            entry = zipfile.ZipInfo(f"quote_{quote.id}{os.path.splitext(document)[1]}",
+                                    date_time=quote.created_at.timetuple()[:6])
+            with open(document, "rb") as source, archive.open(entry, mode="w") as target:
+                while True:
+                    chunk = source.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    target.write(chunk)
+                    yield stream.drain()
+        if errors:
+            archive.writestr("errors.txt", "\n".join(errors) + "\n")
+    yield stream.drain()
@@ -0,0 +1,126 @@
+import json
+import os
+import shutil
+from typing import Dict, List
+
+import numpy as np
+
+ARRAY_NAMES = ['left', 'right', 'feature', 'threshold', 'value', 'roots']
+
+class LabelLookup:
+    """Stand-in for a fitted LabelEncoder that only needs classes_"""
+
+    def __init__(self, classes: List[str]):
+        self.classes_ = np.array(classes, dtype=object)
+        self._codes = {label: code for code, label in enumerate(classes)}
+
+    def transform(self, values) -> np.ndarray:
+        try:
+            return np.array([self._codes[value] for value in values])
+        except KeyError as e:
+            raise ValueError(f"y contains previously unseen labels: {e}")
+
+class ForestArtifact:
+    """Inference-only random forest stored as flat node arrays
+
+    Every tree's nodes are concatenated into shared left/right/feature/threshold/
+    value arrays, with roots[i] the first node of tree i and -1 children marking
+    leaves. The arrays are plain .npy files in a directory, loaded with
+    np.load(mmap_mode='r') so every worker process maps the same page-cache copy.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray], n_features: int, label_encoders: Dict, path: str = None):
+        self.left = arrays['left']
+        self.right = arrays['right']
+        self.feature = arrays['feature']
+        self.threshold = arrays['threshold']
+        self.value = arrays['value']
+        self.roots = arrays['roots']
+        self.n_features = n_features
+        self.label_encoders = label_encoders
+        self.path = path
+
+    @staticmethod
+    def export(model, label_encoders: Dict, path: str):
+        """Flatten a fitted RandomForestRegressor and its encoders into path"""
+        left, right, feature, threshold, value, roots = [], [], [], [], [], []
+        offset = 0
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            is_leaf = tree.children_left == -1
+            roots.append(offset)
+            left.append(np.where(is_leaf, -1, tree.children_left + offset))
+            right.append(np.where(is_leaf, -1, tree.children_right + offset))
+            feature.append(np.where(is_leaf, 0, tree.feature))
+            threshold.append(tree.threshold)
+            value.append(tree.value[:, 0, 0])
+            offset += tree.node_count
+
+        arrays = {
+            'left': np.concatenate(left).astype(np.int32),
+            'right': np.concatenate(right).astype(np.int32),
+            'feature': np.concatenate(feature).astype(np.int32),
+            'threshold': np.concatenate(threshold).astype(np.float64),
+            'value': np.concatenate(value).astype(np.float64),
+            'roots': np.array(roots, dtype=np.int32),
+        }
+        meta = {
+            'n_trees': len(roots),
+            'n_nodes': offset,
+            'n_features': int(model.n_features_in_),
+            'encoders': {col: [str(c) for c in encoder.classes_] for col, encoder in label_encoders.items()},
+        }
+
+        # Build next to the target and swap directories in, so readers see either
+        # the old artifact or the complete new one
+        tmp_path = f"{path}.tmp-{os.getpid()}"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+        for name, array in arrays.items():
+            np.save(os.path.join(tmp_path, f"{name}.npy"), array)
+        with open(os.path.join(tmp_path, 'meta.json'), 'w') as f:
+            json.dump(meta, f)
+
+        old_path = f"{path}.old-{os.getpid()}"
+        if os.path.exists(path):
+            os.rename(path, old_path)
+        os.rename(tmp_path, path)
+        shutil.rmtree(old_path, ignore_errors=True)
+
+    @classmethod
+    def load(cls, path: str) -> "ForestArtifact":
+        """Memory-map an exported forest"""
+        arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r') for name in ARRAY_NAMES}
+        with open(os.path.join(path, 'meta.json'), 'r') as f:
+            meta = json.load(f)
+        label_encoders = {col: LabelLookup(classes) for col, classes in meta['encoders'].items()}
+        return cls(arrays, meta['n_features'], label_encoders, path)
+
+    def __reduce__(self):
+        # Send the path, not the arrays, when handed to another process
+        if self.path is None:
+            raise TypeError("Only artifacts loaded from disk can be pickled")
+        return (ForestArtifact.load, (self.path,))
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    def predict(self, X) -> np.ndarray:
+        """Average leaf value over all trees, walking every (row, tree) pair in lockstep"""
+        # Trees compare float32 features against float64 thresholds, as sklearn does
+        X = np.asarray(X, dtype=np.float32).astype(np.float64)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"X has {X.shape[-1]} features, but the forest is expecting {self.n_features} features as input.")
+        rows = np.arange(len(X))[:, None]
+        nodes = np.broadcast_to(np.asarray(self.roots, dtype=np.intp), (len(X), self.n_trees)).copy()
+
+        while True:
+            left = self.left[nodes]
+            active = left != -1
+            if not active.any():
+                break
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(active, np.where(go_left, left, self.right[nodes]), nodes)
+
+        return self.value[nodes].mean(axis=1)
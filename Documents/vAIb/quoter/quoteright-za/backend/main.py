@@ -1,26 +1,59 @@
-from fastapi import FastAPI, Depends, HTTPException, status, File, UploadFile
+from fastapi import FastAPI, Depends, HTTPException, status, File, UploadFile, Query, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
+from typing import Dict, List, Literal, Optional, Union
+from contextlib import asynccontextmanager
+import asyncio
 import json
+import os
 from datetime import datetime, timedelta, UTC
 
-from database import get_db, User as DBUser, Client as DBClient, Quote as DBQuote, PricingData
+from database import get_db, async_engine, User as DBUser, Client as DBClient, Quote as DBQuote, QuoteItem as DBQuoteItem, PricingData
 from schemas import (
-    UserCreate, UserLogin, User, Token, ClientCreate, Client, 
-    QuoteFeatures, QuoteCreate, QuoteResponse, PricingRecommendation, 
-    TrainingData
+    UserCreate, UserLogin, User, Token, RefreshRequest, ClientCreate, Client, ClientPage,
+    QuoteFeatures, QuoteCreate, QuoteResponse, QuotePage, QuoteSummary, QuoteSummaryPage, QuoteDocument, PricingRecommendation, 
+    ItemRevenue, IndustryPricing, QuoteTotals, Usage, TrainingData, TrainingJob
 )
-from auth import get_password_hash, verify_password, create_access_token, get_current_user_email
-from ai_model import pricing_model
-from pdf_generator import pdf_generator
+from auth import password_hasher, create_access_token, get_current_user_email, user_claims, token_cache
+from training_jobs import training_jobs
+from document_jobs import document_jobs, quote_document_data, user_branding
+from downloads import document_response
+from exports import export_csv, export_jsonl, export_zip
+from pagination import as_stored_time, keyset_page
+from analytics import item_revenue, industry_pricing, quote_totals
+from quotas import quotas
+from refresh_tokens import refresh_tokens
+from user_cache import user_cache
+from db_writer import db_writer
+from db_metrics import DBUsageMiddleware
 from config import settings
 
+def get_pricing_model():
+    """Import the pricing model on first use, keeping ML libraries off the startup path"""
+    from ai_model import pricing_model
+    return pricing_model
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load the pricing model in the background so the first prediction is warm
+    # without holding up requests that don't need it
+    if settings.MODEL_WARMUP:
+        asyncio.get_running_loop().run_in_executor(None, get_pricing_model)
+    yield
+    training_jobs.shutdown()
+    document_jobs.shutdown()
+    password_hasher.shutdown()
+    await db_writer.close()
+
 app = FastAPI(
     title="QuoteRight ZA API",
     description="AI-Powered Quoting Platform for SA Freelancers",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -30,32 +63,46 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
 
+# Connection checkouts per request, reported in a Server-Timing header
+app.add_middleware(DBUsageMiddleware)
+
 security = HTTPBearer()
 
 # Dependency to get current user
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)):
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: AsyncSession = Depends(get_db)):
     email = get_current_user_email(credentials.credentials)
-    user = db.query(DBUser).filter(DBUser.email == email).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
+    user = user_cache.get(email)
+    if user is None:
+        user = await db.scalar(select(DBUser).where(DBUser.email == email))
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        user_cache.put(email, user)
     return user
 
+async def submit_quote_document(quote: DBQuote, user: DBUser, db: AsyncSession, details: Dict = None, client: DBClient = None) -> Dict:
+    """Queue rendering of a quote's document"""
+    if client is None and quote.client_id:
+        client = await db.scalar(select(DBClient).where(DBClient.id == quote.client_id, DBClient.user_id == user.id))
+    quote_dict = quote_document_data(quote, details, client)
+    return document_jobs.submit(quote.id, quote_dict, user_branding(user), tenant=str(user.id))
+
 @app.get("/")
 async def root():
     return {"message": "QuoteRight ZA API - AI-Powered Quoting Platform"}
 
 # Authentication endpoints
 @app.post("/auth/register", response_model=Token)
-async def register(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     # Check if user already exists
-    existing_user = db.query(DBUser).filter(DBUser.email == user_data.email).first()
+    existing_user = await db.scalar(select(DBUser).where(DBUser.email == user_data.email))
     if existing_user:
         raise HTTPException(status_code=400, detail="Email already registered")
     
     # Create new user
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await password_hasher.hash(user_data.password)
     db_user = DBUser(
         email=user_data.email,
         hashed_password=hashed_password,
@@ -64,40 +111,74 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
         experience_level=user_data.experience_level
     )
     
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    db_user = await db_writer.add(db_user)
     
     # Create access token
-    access_token = create_access_token(data={"sub": user_data.email})
-    return {"access_token": access_token, "token_type": "bearer"}
+    access_token = create_access_token(data=user_claims(db_user))
+    refresh_token = await refresh_tokens.issue(db_user.id)
+    return {"access_token": access_token, "token_type": "bearer", "refresh_token": refresh_token}
 
 @app.post("/auth/login", response_model=Token)
-async def login(user_data: UserLogin, db: Session = Depends(get_db)):
-    user = db.query(DBUser).filter(DBUser.email == user_data.email).first()
-    if not user or not verify_password(user_data.password, user.hashed_password):
+async def login(user_data: UserLogin, db: AsyncSession = Depends(get_db)):
+    user = await db.scalar(select(DBUser).where(DBUser.email == user_data.email))
+    if not user:
+        raise HTTPException(status_code=401, detail="Incorrect email or password")
+    # Hand the connection back to the pool while the password is checked
+    await db.close()
+    valid, new_hash = await password_hasher.verify(user_data.password, user.hashed_password)
+    if not valid:
         raise HTTPException(status_code=401, detail="Incorrect email or password")
     
-    access_token = create_access_token(data={"sub": user.email})
-    return {"access_token": access_token, "token_type": "bearer"}
+    # The password was hashed with an older work factor, store it with the current one
+    if new_hash:
+        async def rehash(session: AsyncSession):
+            stored = await session.get(DBUser, user.id)
+            stored.hashed_password = new_hash
+        await db_writer.run(rehash)
+    
+    access_token = create_access_token(data=user_claims(user))
+    refresh_token = await refresh_tokens.issue(user.id)
+    return {"access_token": access_token, "token_type": "bearer", "refresh_token": refresh_token}
+
+@app.post("/auth/refresh", response_model=Token)
+async def refresh(request: RefreshRequest):
+    # Trades the refresh token for a new one, no password check involved
+    user, refresh_token = await refresh_tokens.rotate(request.refresh_token)
+    access_token = create_access_token(data=user_claims(user))
+    return {"access_token": access_token, "token_type": "bearer", "refresh_token": refresh_token}
+
+@app.post("/auth/revoke")
+async def revoke_refresh_tokens(current_user: DBUser = Depends(get_current_user)):
+    # Signs the user out everywhere once their current access tokens expire
+    return {"revoked": await refresh_tokens.revoke_user(current_user.id)}
 
 @app.get("/auth/me", response_model=User)
 async def get_current_user_info(current_user: DBUser = Depends(get_current_user)):
     return current_user
 
+@app.get("/auth/usage", response_model=List[Usage])
+async def get_usage(current_user: DBUser = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    return [await quotas.usage(db, current_user, resource) for resource in quotas.limits]
+
 # AI Pricing endpoints
 @app.post("/ai/predict", response_model=PricingRecommendation)
-async def predict_pricing(features: QuoteFeatures, current_user: DBUser = Depends(get_current_user), db: Session = Depends(get_db)):
-    # Check subscription limits for free tier
-    if current_user.subscription_tier == "free":
-        quote_count = db.query(DBQuote).filter(DBQuote.user_id == current_user.id).count()
-        if quote_count >= 2:
-            raise HTTPException(status_code=403, detail="Free tier limit reached. Upgrade to Pro for unlimited quotes.")
+async def predict_pricing(features: QuoteFeatures, current_user: DBUser = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    # Check the subscription tier's quote limit
+    await quotas.check(db, current_user, "quotes")
     
     # Get AI prediction
-    prediction = pricing_model.predict_price(features.dict())
+    prediction = get_pricing_model().predict_price(features.dict())
     return PricingRecommendation(**prediction)
 
+@app.post("/ai/predict/batch", response_model=List[PricingRecommendation])
+async def predict_pricing_batch(features_list: List[QuoteFeatures], current_user: DBUser = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    # Check the subscription tier's quote limit
+    await quotas.check(db, current_user, "quotes")
+
+    # Score all rows with a single model call
+    predictions = get_pricing_model().predict_many([features.model_dump() for features in features_list])
+    return [PricingRecommendation(**prediction) for prediction in predictions]
+
 @app.get("/ai/industries")
 async def get_industries():
     return {
@@ -131,45 +212,61 @@ async def get_locations():
 
 # Client endpoints
 @app.post("/clients", response_model=Client)
-async def create_client(client_data: ClientCreate, current_user: DBUser = Depends(get_current_user), db: Session = Depends(get_db)):
-    db_client = DBClient(**client_data.dict(), user_id=current_user.id)
-    db.add(db_client)
-    db.commit()
-    db.refresh(db_client)
-    return db_client
-
-@app.get("/clients", response_model=List[Client])
-async def get_clients(current_user: DBUser = Depends(get_current_user), db: Session = Depends(get_db)):
-    clients = db.query(DBClient).filter(DBClient.user_id == current_user.id).all()
-    return clients
+async def create_client(client_data: ClientCreate, current_user: DBUser = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    return await db_writer.add(DBClient(**client_data.dict(), user_id=current_user.id))
+
+@app.get("/clients", response_model=ClientPage)
+async def get_clients(
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    current_user: DBUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    statement = select(DBClient).where(DBClient.user_id == current_user.id)
+    if created_from:
+        statement = statement.where(DBClient.created_at >= as_stored_time(created_from))
+    if created_to:
+        statement = statement.where(DBClient.created_at < as_stored_time(created_to))
+    
+    clients, next_cursor = await keyset_page(db, statement, DBClient, cursor, limit)
+    return {"items": clients, "next_cursor": next_cursor}
 
 @app.get("/clients/{client_id}", response_model=Client)
-async def get_client(client_id: int, current_user: DBUser = Depends(get_current_user), db: Session = Depends(get_db)):
-    client = db.query(DBClient).filter(DBClient.id == client_id, DBClient.user_id == current_user.id).first()
+async def get_client(client_id: int, current_user: DBUser = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    client = await db.scalar(select(DBClient).where(DBClient.id == client_id, DBClient.user_id == current_user.id))
     if not client:
         raise HTTPException(status_code=404, detail="Client not found")
     return client
 
 # Quote endpoints
 @app.post("/quotes", response_model=QuoteResponse)
-async def create_quote(quote_data: QuoteCreate, current_user: DBUser = Depends(get_current_user), db: Session = Depends(get_db)):
+async def create_quote(quote_data: QuoteCreate, current_user: DBUser = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     # Get AI pricing recommendation
     features = quote_data.features.model_dump()
-    prediction = pricing_model.predict_price(features)
+    prediction = get_pricing_model().predict_price(features)
     
     # Calculate final price from items
     final_price = sum(item.total for item in quote_data.items)
     
     # Create or get client
     client_id = quote_data.client_id
-    if quote_data.client_info and not client_id:
+    db_client = None
+    if client_id:
+        db_client = await db.scalar(select(DBClient).where(DBClient.id == client_id, DBClient.user_id == current_user.id))
+        if not db_client:
+            raise HTTPException(status_code=404, detail="Client not found")
+    elif quote_data.client_info:
         db_client = DBClient(**quote_data.client_info.dict(), user_id=current_user.id)
-        db.add(db_client)
-        db.commit()
-        db.refresh(db_client)
-        client_id = db_client.id
     
     # Create quote
+    details = {
+        "features": features,
+        "items": [item.model_dump() for item in quote_data.items],
+        "terms": quote_data.terms,
+        "validity_days": quote_data.validity_days
+    }
     db_quote = DBQuote(
         user_id=current_user.id,
         client_id=client_id,
@@ -181,100 +278,190 @@ async def create_quote(quote_data: QuoteCreate, current_user: DBUser = Depends(g
         ai_recommendation_min=prediction['min_price'],
         ai_recommendation_max=prediction['max_price'],
         final_price=final_price,
-        quote_data=json.dumps({
-            "features": quote_data.features.model_dump(),
-            "items": [item.model_dump() for item in quote_data.items],
-            "terms": quote_data.terms,
-            "validity_days": quote_data.validity_days
-        }),
+        quote_data=json.dumps(details),
         expires_at=datetime.now(UTC) + timedelta(days=quote_data.validity_days)
     )
+    # Items are also stored as rows so they can be queried and aggregated in SQL
+    db_quote.items = [DBQuoteItem(position=position, **item.model_dump()) for position, item in enumerate(quote_data.items)]
     
-    db.add(db_quote)
-    db.commit()
-    db.refresh(db_quote)
+    async def save_quote(session: AsyncSession) -> DBQuote:
+        if db_client is not None and not client_id:
+            session.add(db_client)
+            await session.flush()
+            db_quote.client_id = db_client.id
+        await quotas.record(session, current_user.id, "quotes")
+        session.add(db_quote)
+        await session.flush()
+        return db_quote
     
-    # Generate PDF (temporarily disabled for debugging)
-    # quote_dict = {
-    #     "id": db_quote.id,
-    #     "job_title": db_quote.job_title,
-    #     "industry": db_quote.industry,
-    #     "location": db_quote.location,
-    #     "items": [item.model_dump() for item in quote_data.items],
-    #     "terms": quote_data.terms,
-    #     "validity_days": quote_data.validity_days,
-    #     "client_info": quote_data.client_info.model_dump() if quote_data.client_info else {}
-    # }
-    # 
-    # user_dict = {
-    #     "business_name": current_user.business_name,
-    #     "logo_url": current_user.logo_url
-    # }
-    # 
-    # pdf_path = pdf_generator.save_quote_html(quote_dict, user_dict, db_quote.id)
-    # db_quote.pdf_url = pdf_path
-    # db.commit()
+    # The new client, the quote with its items and the usage count are committed together
+    await db_writer.run(save_quote)
     
-    # For now, just return the quote without PDF generation
-    db_quote.pdf_url = None
+    # Render the document in the background, pdf_url is filled in when it is ready
+    await submit_quote_document(db_quote, current_user, db, details=details, client=db_client)
     
     return db_quote
 
-@app.get("/quotes", response_model=List[QuoteResponse])
-async def get_quotes(current_user: DBUser = Depends(get_current_user), db: Session = Depends(get_db)):
-    quotes = db.query(DBQuote).filter(DBQuote.user_id == current_user.id).all()
-    return quotes
+@app.get("/quotes", response_model=Union[QuotePage, QuoteSummaryPage])
+async def get_quotes(
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    view: Literal["full", "summary"] = "full",
+    status: Optional[str] = None,
+    industry: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    current_user: DBUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    # Equality filters come first in the matching (user_id, ..., created_at, id) index
+    statement = select(DBQuote).where(DBQuote.user_id == current_user.id)
+    if status:
+        statement = statement.where(DBQuote.status == status)
+    if industry:
+        statement = statement.where(DBQuote.industry == industry)
+    if created_from:
+        statement = statement.where(DBQuote.created_at >= as_stored_time(created_from))
+    if created_to:
+        statement = statement.where(DBQuote.created_at < as_stored_time(created_to))
+    
+    if view == "summary":
+        # Only select the summary's columns, quote_data in particular is never read
+        statement = statement.options(load_only(*(getattr(DBQuote, field) for field in QuoteSummary.model_fields)))
+        quotes, next_cursor = await keyset_page(db, statement, DBQuote, cursor, limit)
+        # Serialized here, response_model would otherwise re-validate the page against both models
+        page = QuoteSummaryPage(items=quotes, next_cursor=next_cursor)
+        return Response(content=page.model_dump_json(), media_type="application/json")
+    
+    quotes, next_cursor = await keyset_page(db, statement, DBQuote, cursor, limit)
+    return {"items": quotes, "next_cursor": next_cursor}
+
+@app.get("/quotes/export")
+async def export_quotes(format: str = "zip", current_user: DBUser = Depends(get_current_user)):
+    # Everything is generated while streaming, one batch of rows and a few documents at a time
+    if format == "zip":
+        body, media_type = export_zip(current_user.id, user_branding(current_user)), "application/zip"
+    elif format == "csv":
+        body, media_type = export_csv(current_user.id), "text/csv"
+    elif format == "jsonl":
+        body, media_type = export_jsonl(current_user.id), "application/x-ndjson"
+    else:
+        raise HTTPException(status_code=400, detail="Export format must be zip, csv or jsonl")
+    
+    headers = {"Content-Disposition": f'attachment; filename="quotes.{format}"'}
+    return StreamingResponse(body, media_type=media_type, headers=headers)
 
 @app.get("/quotes/{quote_id}", response_model=QuoteResponse)
-async def get_quote(quote_id: int, current_user: DBUser = Depends(get_current_user), db: Session = Depends(get_db)):
-    quote = db.query(DBQuote).filter(DBQuote.id == quote_id, DBQuote.user_id == current_user.id).first()
+async def get_quote(quote_id: int, current_user: DBUser = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    quote = await db.scalar(select(DBQuote).where(DBQuote.id == quote_id, DBQuote.user_id == current_user.id))
     if not quote:
         raise HTTPException(status_code=404, detail="Quote not found")
     return quote
 
 @app.put("/quotes/{quote_id}/status")
-async def update_quote_status(quote_id: int, status: str, current_user: DBUser = Depends(get_current_user), db: Session = Depends(get_db)):
-    quote = db.query(DBQuote).filter(DBQuote.id == quote_id, DBQuote.user_id == current_user.id).first()
-    if not quote:
-        raise HTTPException(status_code=404, detail="Quote not found")
+async def update_quote_status(quote_id: int, status: str, current_user: DBUser = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    async def set_status(session: AsyncSession) -> bool:
+        result = await session.execute(update(DBQuote)
+                                       .where(DBQuote.id == quote_id, DBQuote.user_id == current_user.id)
+                                       .values(status=status))
+        return result.rowcount > 0
     
-    quote.status = status
-    db.commit()
+    if not await db_writer.run(set_status):
+        raise HTTPException(status_code=404, detail="Quote not found")
     return {"message": "Quote status updated successfully"}
 
 # PDF endpoints
-@app.get("/quotes/{quote_id}/pdf")
-async def get_quote_pdf(quote_id: int, current_user: DBUser = Depends(get_current_user), db: Session = Depends(get_db)):
-    quote = db.query(DBQuote).filter(DBQuote.id == quote_id, DBQuote.user_id == current_user.id).first()
+async def quote_document(quote: DBQuote, user: DBUser, db: AsyncSession) -> QuoteDocument:
+    """Where a quote's document stands, queueing it if nothing is producing it"""
+    # A document evicted from the cache is rendered again
+    if quote.pdf_url and os.path.exists(quote.pdf_url):
+        return QuoteDocument(quote_id=quote.id, status="ready", pdf_url=quote.pdf_url)
+    
+    job = document_jobs.get(quote.id)
+    if job is None:
+        # The job may have just finished, otherwise nothing is queued, e.g. the
+        # quote predates the queue, the server restarted mid-render or the file was evicted
+        await db.refresh(quote)
+        if quote.pdf_url and os.path.exists(quote.pdf_url):
+            return QuoteDocument(quote_id=quote.id, status="ready", pdf_url=quote.pdf_url)
+        job = await submit_quote_document(quote, user, db)
+    elif document_jobs.can_retry(job):
+        # The last render failed, try it again now the document is wanted
+        job = await submit_quote_document(quote, user, db)
+    return QuoteDocument(quote_id=quote.id, status=job["status"], error=job["error"])
+
+@app.get("/quotes/{quote_id}/pdf", response_model=QuoteDocument)
+async def get_quote_pdf(quote_id: int, response: Response, current_user: DBUser = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    quote = await db.scalar(select(DBQuote).where(DBQuote.id == quote_id, DBQuote.user_id == current_user.id))
     if not quote:
         raise HTTPException(status_code=404, detail="Quote not found")
     
-    if not quote.pdf_url:
-        raise HTTPException(status_code=404, detail="PDF not generated")
+    document = await quote_document(quote, current_user, db)
+    if document.status == "pending":
+        response.status_code = status.HTTP_202_ACCEPTED
+    return document
+
+@app.get("/quotes/{quote_id}/pdf/download")
+async def download_quote_pdf(quote_id: int, request: Request, current_user: DBUser = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    quote = await db.scalar(select(DBQuote).where(DBQuote.id == quote_id, DBQuote.user_id == current_user.id))
+    if not quote:
+        raise HTTPException(status_code=404, detail="Quote not found")
+    
+    document = await quote_document(quote, current_user, db)
+    if document.status == "pending":
+        return JSONResponse(status_code=status.HTTP_202_ACCEPTED, content=document.model_dump())
+    if document.status == "failed":
+        raise HTTPException(status_code=500, detail=f"Document generation failed: {document.error}")
     
-    return {"pdf_url": quote.pdf_url}
+    extension = os.path.splitext(document.pdf_url)[1]
+    return document_response(request, document.pdf_url, f"quote_{quote.id}{extension}")
+
+# Analytics endpoints
+@app.get("/analytics/items", response_model=List[ItemRevenue])
+async def get_item_revenue(status: Optional[str] = None, limit: int = Query(50, ge=1, le=500), current_user: DBUser = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    return await item_revenue(db, current_user.id, status, limit)
+
+@app.get("/analytics/industries", response_model=List[IndustryPricing])
+async def get_industry_pricing(status: Optional[str] = None, current_user: DBUser = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    return await industry_pricing(db, current_user.id, status)
+
+@app.get("/analytics/summary", response_model=QuoteTotals)
+async def get_quote_totals(current_user: DBUser = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    return await quote_totals(db, current_user.id)
 
 # Admin endpoints (for model training)
-@app.post("/admin/train-model")
-async def train_model(training_data: List[TrainingData], db: Session = Depends(get_db)):
+@app.post("/admin/train-model", response_model=TrainingJob, status_code=202)
+async def train_model(training_data: List[TrainingData], db: AsyncSession = Depends(get_db)):
     # Convert to format expected by model
     data = [item.model_dump() for item in training_data]
-    pricing_model.train_model(data)
-    return {"message": "Model trained successfully"}
+    # Fit in the background; the new model is swapped in once training completes
+    return training_jobs.submit(data)
+
+@app.get("/admin/train-model/{job_id}", response_model=TrainingJob)
+async def get_training_job(job_id: str):
+    job = training_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Training job not found")
+    return job
 
 @app.get("/admin/stats")
-async def get_stats(current_user: DBUser = Depends(get_current_user), db: Session = Depends(get_db)):
+async def get_stats(current_user: DBUser = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     if current_user.subscription_tier != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
     
-    total_quotes = db.query(DBQuote).count()
-    total_users = db.query(DBUser).count()
-    total_clients = db.query(DBClient).count()
+    total_quotes = await db.scalar(select(func.count()).select_from(DBQuote))
+    total_users = await db.scalar(select(func.count()).select_from(DBUser))
+    total_clients = await db.scalar(select(func.count()).select_from(DBClient))
     
     return {
         "total_quotes": total_quotes,
         "total_users": total_users,
-        "total_clients": total_clients
+        "total_clients": total_clients,
+        "user_cache": user_cache.stats(),
+        "token_cache": token_cache.stats(),
+        "db_writer": db_writer.stats(),
+        "password_hasher": password_hasher.stats(),
+        "db_pool": async_engine.pool.usage_stats()
     }
 
 if __name__ == "__main__":
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+One-off migration: copy the line items stored in each quote's quote_data JSON
+into the quote_items table
+
+Quotes are read in id order one batch at a time and each batch is committed on
+its own, so memory stays flat however many quotes there are, and an interrupted
+run can simply be started again: quotes that already have items are skipped.
+
+Run from the backend directory: python migrate_quote_items.py [--batch-size N]
+"""
+
+import argparse
+import json
+
+from sqlalchemy import exists, insert
+
+from database import SessionLocal, Quote, QuoteItem
+
+def migrate_quote_items(batch_size: int = 500):
+    db = SessionLocal()
+    migrated = items_written = unreadable = 0
+    last_id = 0
+    try:
+        has_items = exists().where(QuoteItem.quote_id == Quote.id)
+        while True:
+            batch = (db.query(Quote.id, Quote.quote_data)
+                     .filter(Quote.id > last_id, ~has_items)
+                     .order_by(Quote.id)
+                     .limit(batch_size)
+                     .all())
+            if not batch:
+                break
+
+            rows = []
+            for quote_id, quote_data in batch:
+                try:
+                    items = json.loads(quote_data or "{}").get("items") or []
+                    # A quote's items are written together or not at all
+                    if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+                        raise ValueError("items is not a list of objects")
+                    quote_rows = [{
+                        "quote_id": quote_id,
+                        "position": position,
+                        "description": item.get("description"),
+                        "quantity": item.get("quantity"),
+                        "unit_price": item.get("unit_price"),
+                        "total": item.get("total"),
+                    } for position, item in enumerate(items)]
+                except (ValueError, AttributeError):
+                    unreadable += 1
+                    continue
+                rows.extend(quote_rows)
+                migrated += 1
+
+            if rows:
+                db.execute(insert(QuoteItem), rows)
+            db.commit()
+            items_written += len(rows)
+            last_id = batch[-1][0]
+            print(f"  ...up to quote {last_id}: {migrated} quotes, {items_written} items")
+    finally:
+        db.close()
+
+    print(f"✅ Migrated {items_written} items from {migrated} quotes")
+    if unreadable:
+        print(f"❌ Skipped {unreadable} quotes whose quote_data or items could not be read")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+    migrate_quote_items(args.batch_size)
@@ -1,16 +1,58 @@
 import json
 from datetime import datetime, timedelta
-from typing import Dict, List
+from typing import Dict, List, Optional
 import os
-from jinja2 import Template
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, select_autoescape
 import base64
 from config import settings
+from document_cache import document_cache
 
 class PDFGenerator:
+    DEFAULT_TEMPLATE = "quote_template.html"
+    # Part of every cached HTML document's key and compiled template's file name,
+    # bump it when escaping or anything else about compiling templates changes
+    HTML_VERSION = 2
+    
     def __init__(self):
         self.template_dir = os.path.join(os.path.dirname(__file__), "templates")
         os.makedirs(self.template_dir, exist_ok=True)
-        self.create_default_template()
+        # Only write the default template on first run, not on every worker start
+        if not os.path.exists(os.path.join(self.template_dir, self.DEFAULT_TEMPLATE)):
+            self.create_default_template()
+        
+        # Templates are compiled once and kept in the environment; auto_reload
+        # recompiles one when its file's mtime changes, and the bytecode cache
+        # lets other workers and restarts skip the compile step
+        if settings.TEMPLATE_CACHE_DIR:
+            os.makedirs(settings.TEMPLATE_CACHE_DIR, exist_ok=True)
+        # Quote fields are user input, so anything rendered into HTML is escaped
+        self.env = Environment(
+            loader=FileSystemLoader(self.template_dir),
+            bytecode_cache=FileSystemBytecodeCache(settings.TEMPLATE_CACHE_DIR or None,
+                                                   f"__jinja2_v{self.HTML_VERSION}_%s.cache"),
+            auto_reload=settings.TEMPLATE_AUTO_RELOAD,
+            autoescape=select_autoescape(["html", "xml"]),
+        )
+    
+    def get_template(self, template_name: Optional[str] = None, tenant: Optional[str] = None):
+        """Tenant's own copy of a named template, falling back to the shared one
+        
+        Tenant templates live in templates/tenants/<tenant>/<template_name>.
+        """
+        template_name = template_name or self.DEFAULT_TEMPLATE
+        candidates = [template_name]
+        if tenant is not None:
+            candidates.insert(0, f"tenants/{tenant}/{template_name}")
+        return self.env.select_template(candidates)
+    
+    def list_templates(self, tenant: Optional[str] = None) -> List[str]:
+        """Template names available to a tenant"""
+        all_names = self.env.list_templates(extensions=["html"])
+        names = {name for name in all_names if not name.startswith("tenants/")}
+        if tenant is not None:
+            prefix = f"tenants/{tenant}/"
+            names.update(name[len(prefix):] for name in all_names if name.startswith(prefix))
+        return sorted(names)
     
     def create_default_template(self):
         """Create default HTML template for quotes"""
@@ -80,7 +122,7 @@ class PDFGenerator:
             </tr>
         </thead>
         <tbody>
-            {% for item in quote_data.items %}
+            {% for item in quote_data['items'] %}
             <tr>
                 <td>{{ item.description }}</td>
                 <td>{{ item.quantity }}</td>
@@ -110,64 +152,78 @@ class PDFGenerator:
 </html>
         """
         
-        template_path = os.path.join(self.template_dir, "quote_template.html")
+        template_path = os.path.join(self.template_dir, self.DEFAULT_TEMPLATE)
         with open(template_path, 'w') as f:
             f.write(template_html)
     
-    def generate_quote_html(self, quote_data: Dict, user_data: Dict) -> str:
-        """Generate HTML for quote"""
-        template_path = os.path.join(self.template_dir, "quote_template.html")
-        
-        with open(template_path, 'r') as f:
-            template_content = f.read()
-        
-        template = Template(template_content)
-        
-        # Prepare data for template
+    def quote_context(self, quote_data: Dict, user_data: Dict) -> Dict:
+        """Fields shown on a quote document, shared by the HTML and PDF output"""
         items = quote_data.get('items', [])
         total = sum(item.get('total', 0) for item in items)
+        # Dated by the quote rather than the render, so the same quote always gives the same document
+        issued = datetime.fromisoformat(quote_data['created_at']) if quote_data.get('created_at') else datetime.now()
         
-        template_data = {
-            'quote_data': {
-                'business_name': user_data.get('business_name', 'Your Business'),
-                'logo_url': user_data.get('logo_url'),
-                'quote_id': f"Q{quote_data.get('id', '0000')}",
-                'date': datetime.now().strftime('%Y-%m-%d'),
-                'valid_until': (datetime.now() + timedelta(days=quote_data.get('validity_days', 30))).strftime('%Y-%m-%d'),
-                'job_title': quote_data.get('job_title', ''),
-                'industry': quote_data.get('industry', ''),
-                'location': quote_data.get('location', ''),
-                'client': quote_data.get('client_info', {}),
-                'items': items,
-                'total': total,
-                'terms': quote_data.get('terms', '')
-            }
+        return {
+            'business_name': user_data.get('business_name', 'Your Business'),
+            'logo_url': user_data.get('logo_url'),
+            'quote_id': f"Q{quote_data.get('id', '0000')}",
+            'date': issued.strftime('%Y-%m-%d'),
+            'valid_until': (issued + timedelta(days=quote_data.get('validity_days', 30))).strftime('%Y-%m-%d'),
+            'job_title': quote_data.get('job_title', ''),
+            'industry': quote_data.get('industry', ''),
+            'location': quote_data.get('location', ''),
+            'client': quote_data.get('client_info', {}),
+            'items': items,
+            'total': total,
+            'terms': quote_data.get('terms', '')
         }
-        
-        return template.render(**template_data)
     
-    def save_quote_html(self, quote_data: Dict, user_data: Dict, quote_id: int) -> str:
-        """Save quote HTML and return file path"""
-        html_content = self.generate_quote_html(quote_data, user_data)
+    def generate_quote_html(self, quote_data: Dict, user_data: Dict,
+                            template_name: Optional[str] = None, tenant: Optional[str] = None) -> str:
+        """Generate HTML for quote"""
+        template = self.get_template(template_name, tenant)
+        return template.render(quote_data=self.quote_context(quote_data, user_data))
+    
+    def generate_quote_pdf(self, quote_data: Dict, user_data: Dict) -> bytes:
+        """Generate PDF for quote"""
+        return self.render_pdf(self.quote_context(quote_data, user_data))
+    
+    def render_pdf(self, context: Dict) -> bytes:
+        """Render a quote context on a warm renderer from the pool"""
+        # reportlab is only imported by the processes that render documents
+        from pdf_renderer import renderer_pool
         
-        # Create uploads directory
-        uploads_dir = os.path.join(os.path.dirname(__file__), "uploads")
-        os.makedirs(uploads_dir, exist_ok=True)
+        with renderer_pool.renderer() as renderer:
+            return renderer.render(context)
+    
+    def template_version(self, template) -> List:
+        """Identifies the template file behind a render, changing whenever it is edited"""
+        stat = os.stat(template.filename)
+        return [template.name, stat.st_mtime_ns, stat.st_size]
+    
+    def save_quote_html(self, quote_data: Dict, user_data: Dict, quote_id: int,
+                        template_name: Optional[str] = None, tenant: Optional[str] = None) -> str:
+        """Save quote HTML and return file path, reusing an identical earlier render"""
+        template = self.get_template(template_name, tenant)
+        context = self.quote_context(quote_data, user_data)
+        key = document_cache.key("html", context, self.HTML_VERSION, self.template_version(template))
         
-        # Save HTML file
-        filename = f"quote_{quote_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html"
-        filepath = os.path.join(uploads_dir, filename)
+        cached = document_cache.get(key, "html")
+        if cached:
+            return cached
+        return document_cache.put(key, "html", template.render(quote_data=context))
+    
+    def save_quote_pdf(self, quote_data: Dict, user_data: Dict, quote_id: int) -> str:
+        """Save quote PDF and return file path, reusing an identical earlier render"""
+        from pdf_renderer import RENDERER_VERSION
         
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(html_content)
+        context = self.quote_context(quote_data, user_data)
+        key = document_cache.key("pdf", context, RENDERER_VERSION, settings.PDF_FONT_PATH, settings.PDF_BOLD_FONT_PATH)
         
-        return filepath
-    
-    def convert_html_to_pdf(self, html_filepath: str) -> str:
-        """Convert HTML to PDF (placeholder - would use weasyprint or similar)"""
-        # For now, return the HTML filepath
-        # In production, you would use weasyprint or puppeteer to convert HTML to PDF
-        return html_filepath
+        cached = document_cache.get(key, "pdf")
+        if cached:
+            return cached
+        return document_cache.put(key, "pdf", self.render_pdf(context))
 
 # Global PDF generator instance
 pdf_generator = PDFGenerator() 
\ No newline at end of file
@@ -0,0 +1,210 @@
+import io
+import queue
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+from xml.sax.saxutils import escape
+
+from PIL import Image as PILImage
+
+from reportlab import rl_config
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_RIGHT
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.lib.units import mm
+from reportlab.lib.utils import ImageReader, open_for_read
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.platypus import Flowable, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+from config import settings
+
+# Embed image data as binary; ASCII85 only makes streams bigger and is encoded in
+# pure Python when reportlab's accelerator isn't built
+rl_config.useA85 = 0
+
+# Part of every cached PDF's key, bump it when the layout changes
+RENDERER_VERSION = 1
+
+BRAND_COLOUR = colors.HexColor("#007bff")
+LOGO_MAX_WIDTH = 60 * mm
+LOGO_MAX_HEIGHT = 25 * mm
+LOGO_DPI = 200
+
+_fonts = None
+_fonts_lock = threading.Lock()
+
+def register_fonts() -> Tuple[str, str]:
+    """Register the configured TrueType fonts once per process, returning (regular, bold)
+
+    Without PDF_FONT_PATH the built-in Helvetica faces are used, which need no
+    font file at all.
+    """
+    global _fonts
+    with _fonts_lock:
+        if _fonts is None:
+            if settings.PDF_FONT_PATH:
+                pdfmetrics.registerFont(TTFont("QuoteFont", settings.PDF_FONT_PATH))
+                pdfmetrics.registerFont(TTFont("QuoteFont-Bold", settings.PDF_BOLD_FONT_PATH or settings.PDF_FONT_PATH))
+                _fonts = ("QuoteFont", "QuoteFont-Bold")
+            else:
+                _fonts = ("Helvetica", "Helvetica-Bold")
+        return _fonts
+
+class Logo(Flowable):
+    """Draws an already decoded image; platypus' Image only takes files"""
+
+    def __init__(self, image: ImageReader, width: float, height: float):
+        super().__init__()
+        self.image = image
+        self.width = width
+        self.height = height
+        self.hAlign = 'LEFT'
+
+    def wrap(self, available_width, available_height):
+        return self.width, self.height
+
+    def draw(self):
+        self.canv.drawImage(self.image, 0, 0, self.width, self.height, mask='auto')
+
+def money(value) -> str:
+    return f"R{float(value or 0):,.2f}"
+
+class QuotePDFRenderer:
+    """Lays out a quote directly with reportlab
+
+    Styles, table styling and fonts are set up once per renderer, and business
+    logos are kept decoded and downscaled in a small LRU so a user's logo is
+    fetched and processed once rather than for every document.
+    """
+
+    def __init__(self, logo_cache_size: int = 32):
+        font, bold = register_fonts()
+        self.styles = {
+            'title': ParagraphStyle('title', fontName=bold, fontSize=20, leading=24, textColor=BRAND_COLOUR),
+            'heading': ParagraphStyle('heading', fontName=bold, fontSize=12, leading=16, spaceBefore=8, spaceAfter=4),
+            'body': ParagraphStyle('body', fontName=font, fontSize=10, leading=14),
+            'cell': ParagraphStyle('cell', fontName=font, fontSize=9, leading=11),
+            'total': ParagraphStyle('total', fontName=bold, fontSize=14, leading=18, alignment=TA_RIGHT),
+            'small': ParagraphStyle('small', fontName=font, fontSize=8, leading=10, textColor=colors.grey),
+        }
+        self.items_style = TableStyle([
+            ('FONTNAME', (0, 0), (-1, 0), bold),
+            ('FONTNAME', (0, 1), (-1, -1), font),
+            ('FONTSIZE', (0, 0), (-1, -1), 9),
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor("#f8f9fa")),
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor("#dddddd")),
+            ('ALIGN', (1, 0), (-1, -1), 'RIGHT'),
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        ])
+        self.logo_cache_size = logo_cache_size
+        self._logos: "OrderedDict[str, Optional[ImageReader]]" = OrderedDict()
+
+    def _logo(self, logo_url: str) -> Optional[ImageReader]:
+        if logo_url in self._logos:
+            self._logos.move_to_end(logo_url)
+            return self._logos[logo_url]
+        try:
+            # Shrink to what the page can show once, rather than compressing the
+            # full-size image into every document
+            image = PILImage.open(open_for_read(logo_url))
+            image.thumbnail((int(LOGO_MAX_WIDTH / 72 * LOGO_DPI), int(LOGO_MAX_HEIGHT / 72 * LOGO_DPI)))
+            if image.mode in ('RGBA', 'LA') or 'transparency' in image.info:
+                logo = ImageReader(image)
+            else:
+                # Opaque logos are kept as JPEG, which reportlab embeds as-is
+                # instead of deflating the raw pixels again for every document
+                encoded = io.BytesIO()
+                image.convert('RGB').save(encoded, 'JPEG', quality=90)
+                logo = ImageReader(encoded)
+        except Exception as e:
+            # Remember the failure too, so a broken logo URL isn't retried per document
+            print(f"Could not load logo {logo_url}: {e}")
+            logo = None
+        self._logos[logo_url] = logo
+        if len(self._logos) > self.logo_cache_size:
+            self._logos.popitem(last=False)
+        return logo
+
+    def _paragraph(self, text, style: str) -> Paragraph:
+        return Paragraph(escape(str(text)).replace("\n", "<br/>"), self.styles[style])
+
+    def render(self, quote: Dict) -> bytes:
+        """PDF bytes for the quote context built by PDFGenerator.quote_context"""
+        buffer = io.BytesIO()
+        doc = SimpleDocTemplate(buffer, pagesize=A4, leftMargin=20 * mm, rightMargin=20 * mm,
+                                topMargin=20 * mm, bottomMargin=20 * mm,
+                                title=f"Quote {quote['quote_id']}", author=quote['business_name'])
+        story = []
+
+        logo = self._logo(quote['logo_url']) if quote.get('logo_url') else None
+        if logo is not None:
+            width, height = logo.getSize()
+            scale = min(LOGO_MAX_WIDTH / width, LOGO_MAX_HEIGHT / height, 72 / LOGO_DPI)
+            story.append(Logo(logo, width * scale, height * scale))
+            story.append(Spacer(1, 4 * mm))
+        story.append(self._paragraph(quote['business_name'], 'title'))
+        story.append(self._paragraph("Professional Quote", 'small'))
+
+        story.append(self._paragraph("Quote Details", 'heading'))
+        for label, key in (("Quote #", 'quote_id'), ("Date", 'date'), ("Valid Until", 'valid_until'),
+                           ("Job", 'job_title'), ("Industry", 'industry'), ("Location", 'location')):
+            story.append(Paragraph(f"<b>{label}:</b> {escape(str(quote.get(key) or ''))}", self.styles['body']))
+
+        client = quote.get('client') or {}
+        story.append(self._paragraph("Client Information", 'heading'))
+        for label, key in (("Name", 'name'), ("Company", 'company'), ("Email", 'email'),
+                           ("Phone", 'phone'), ("Address", 'address')):
+            if client.get(key) or key == 'name':
+                story.append(Paragraph(f"<b>{label}:</b> {escape(str(client.get(key) or ''))}", self.styles['body']))
+
+        story.append(self._paragraph("Items", 'heading'))
+        rows = [["Description", "Quantity", "Unit Price", "Total"]]
+        for item in quote['items']:
+            rows.append([self._paragraph(item.get('description', ''), 'cell'), f"{item.get('quantity', 0):g}",
+                         money(item.get('unit_price')), money(item.get('total'))])
+        table = Table(rows, colWidths=[85 * mm, 20 * mm, 32 * mm, 33 * mm], repeatRows=1)
+        table.setStyle(self.items_style)
+        story.append(table)
+        story.append(Spacer(1, 4 * mm))
+        story.append(self._paragraph(f"Total: {money(quote['total'])}", 'total'))
+
+        if quote.get('terms'):
+            story.append(self._paragraph("Terms & Conditions", 'heading'))
+            story.append(self._paragraph(quote['terms'], 'body'))
+
+        doc.build(story)
+        return buffer.getvalue()
+
+class RendererPool:
+    """A bounded set of warm renderers shared by the threads of one process
+
+    Renderers are created on first demand up to size and then reused; a caller
+    that finds them all busy waits for one to be returned.
+    """
+
+    def __init__(self, size: int):
+        self.size = max(1, size)
+        self._idle: "queue.LifoQueue[QuotePDFRenderer]" = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def renderer(self):
+        try:
+            renderer = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                create = self._created < self.size
+                if create:
+                    self._created += 1
+            renderer = QuotePDFRenderer() if create else self._idle.get()
+        try:
+            yield renderer
+        finally:
+            self._idle.put(renderer)
+
+# Global renderer pool, one per process
+renderer_pool = RendererPool(settings.DOCUMENT_WORKERS)
@@ -0,0 +1,39 @@
+import threading
+from collections import defaultdict
+from typing import Any, Callable, Dict, List
+
+class LocalPubSub:
+    """In-process publish/subscribe
+
+    Stands in for a shared broker such as Redis pub/sub. Every message
+    published on a channel is delivered to all of that channel's subscribers,
+    synchronously and in the publisher's thread. A real broker only needs the
+    same publish() and subscribe() methods to replace it.
+    """
+
+    def __init__(self):
+        self._subscribers: Dict[str, List[Callable[[Any], None]]] = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def subscribe(self, channel: str, callback: Callable[[Any], None]):
+        with self._lock:
+            self._subscribers[channel].append(callback)
+
+    def unsubscribe(self, channel: str, callback: Callable[[Any], None]):
+        with self._lock:
+            if callback in self._subscribers[channel]:
+                self._subscribers[channel].remove(callback)
+
+    def publish(self, channel: str, message: Any) -> int:
+        """Deliver message to the channel's subscribers, returning how many got it"""
+        with self._lock:
+            subscribers = list(self._subscribers[channel])
+        for callback in subscribers:
+            try:
+                callback(message)
+            except Exception as e:
+                print(f"Error delivering message on {channel}: {e}")
+        return len(subscribers)
+
+# Global pub/sub instance
+pubsub = LocalPubSub()
@@ -0,0 +1,135 @@
+from datetime import datetime, timedelta, UTC
+from typing import Dict, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import func, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from database import Quote, UsageCounter
+
+# Start of the single period used when limits never reset
+EPOCH = datetime(1970, 1, 1)
+
+# Where each resource's usage comes from, used to seed a user's counter the first time
+USAGE_SOURCES = {
+    "quotes": (Quote.user_id, Quote.created_at),
+}
+
+def parse_limits(spec: str) -> Dict[str, int]:
+    """'free=2,pro=100' -> {'free': 2, 'pro': 100}"""
+    limits = {}
+    for pair in spec.split(","):
+        if pair.strip():
+            tier, limit = pair.split("=")
+            limits[tier.strip()] = int(limit)
+    return limits
+
+class QuotaManager:
+    """Per-user usage counters checked against per-tier limits
+
+    Each user has one usage_counters row per resource holding what they have
+    used in the current period, so checking a quota is a single indexed row
+    read instead of a COUNT over their whole history. A counter from an earlier
+    period is reset the first time it is touched in the new one.
+    """
+
+    def __init__(self, limits: Dict[str, Dict[str, int]], period: str = "none"):
+        self.limits = limits
+        self.period = period
+
+    def limit_for(self, resource: str, tier: str) -> Optional[int]:
+        """The tier's limit for resource, None when it is unlimited"""
+        return self.limits.get(resource, {}).get(tier)
+
+    def period_start(self, now: Optional[datetime] = None) -> datetime:
+        # Stored timestamps are naive UTC
+        now = now or datetime.now(UTC).replace(tzinfo=None)
+        if self.period == "day":
+            return now.replace(hour=0, minute=0, second=0, microsecond=0)
+        if self.period == "month":
+            return now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        return EPOCH
+
+    def next_reset(self, period_start: datetime) -> Optional[datetime]:
+        if self.period == "day":
+            return period_start + timedelta(days=1)
+        if self.period == "month":
+            return (period_start.replace(day=28) + timedelta(days=4)).replace(day=1)
+        return None
+
+    async def _seed(self, db: AsyncSession, user_id: int, resource: str, start: datetime) -> int:
+        user_column, time_column = USAGE_SOURCES[resource]
+        # Rows the caller hasn't flushed yet are counted by record(), not here
+        with db.no_autoflush:
+            return await db.scalar(select(func.count()).where(user_column == user_id, time_column >= start))
+
+    async def _used(self, db: AsyncSession, user_id: int, resource: str) -> Tuple[int, datetime]:
+        """(uses so far, start of the period) without writing anything
+
+        A counter that doesn't exist yet is worked out from the user's history,
+        and one from an earlier period counts as nothing used; record() stores
+        either when the next use is counted.
+        """
+        start = self.period_start()
+        # Plain column values, so the request session holds no counter it could flush
+        counter = (await db.execute(
+            select(UsageCounter.used, UsageCounter.period_start)
+            .where(UsageCounter.user_id == user_id, UsageCounter.resource == resource)
+        )).first()
+        if counter is None:
+            return await self._seed(db, user_id, resource, start), start
+        if counter.period_start < start:
+            return 0, start
+        return counter.used, counter.period_start
+
+    async def usage(self, db: AsyncSession, user, resource: str) -> Dict:
+        used, start = await self._used(db, user.id, resource)
+        return {
+            "resource": resource,
+            "used": used,
+            "limit": self.limit_for(resource, user.subscription_tier),
+            "resets_at": self.next_reset(start),
+        }
+
+    async def check(self, db: AsyncSession, user, resource: str, amount: int = 1):
+        """Raise 403 if amount more uses would take the user past their tier's limit"""
+        limit = self.limit_for(resource, user.subscription_tier)
+        if limit is None:
+            return
+        used, _ = await self._used(db, user.id, resource)
+        if used + amount > limit:
+            if user.subscription_tier == "free":
+                raise HTTPException(status_code=403, detail="Free tier limit reached. Upgrade to Pro for unlimited quotes.")
+            raise HTTPException(status_code=403, detail=f"{resource.capitalize()} limit of {limit} reached for this period")
+
+    async def record(self, db: AsyncSession, user_id: int, resource: str, amount: int = 1):
+        """Count amount more uses, committed with the caller's transaction
+
+        The only place counters are written: a missing counter is created
+        seeded from the user's history, and one from an earlier period is
+        reset, in the same transaction as the uses being counted.
+        """
+        start = self.period_start()
+        counter = (UsageCounter.user_id == user_id, UsageCounter.resource == resource)
+        # Atomic UPDATEs, so concurrent requests can't lose each other's counts
+        increment = update(UsageCounter).where(*counter).values(used=UsageCounter.used + amount)
+        result = await db.execute(increment.where(UsageCounter.period_start == start))
+        if result.rowcount:
+            return
+        reset = update(UsageCounter).where(*counter, UsageCounter.period_start < start).values(period_start=start, used=amount)
+        result = await db.execute(reset)
+        if result.rowcount:
+            return
+        # No counter yet
+        used = await self._seed(db, user_id, resource, start)
+        try:
+            async with db.begin_nested():
+                db.add(UsageCounter(user_id=user_id, resource=resource, period_start=start, used=used + amount))
+        except IntegrityError:
+            # Another request created it first
+            await db.execute(increment)
+
+# Global quota manager instance
+quotas = QuotaManager({"quotes": parse_limits(settings.QUOTE_LIMITS)}, settings.QUOTE_LIMIT_PERIOD)
@@ -0,0 +1,89 @@
+import hashlib
+import secrets
+from datetime import datetime, timedelta, UTC
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from database import RefreshToken, User
+from db_writer import db_writer
+
+def hash_refresh_token(token: str) -> str:
+    # Tokens are 256 random bits, so a plain SHA-256 is enough to keep the stored hash useless
+    return hashlib.sha256(token.encode()).hexdigest()
+
+class RefreshTokenStore:
+    """Long-lived refresh tokens that get a client new access tokens without a password
+
+    Exchanging one costs a hash lookup and signing a JWT instead of a bcrypt
+    verify. Only each token's SHA-256 is stored. Every exchange revokes the
+    token used and issues a new one, and a revoked token presented again is
+    taken as a sign it leaked, so all of that user's tokens are revoked.
+    """
+
+    def __init__(self, expire_days: int = 30):
+        self.expire_days = expire_days
+
+    def _add(self, session: AsyncSession, user_id: int, now: datetime) -> str:
+        token = secrets.token_urlsafe(32)
+        session.add(RefreshToken(user_id=user_id, token_hash=hash_refresh_token(token), created_at=now,
+                                 expires_at=now + timedelta(days=self.expire_days)))
+        return token
+
+    async def _revoke_all(self, session: AsyncSession, user_id: int, now: datetime) -> int:
+        result = await session.execute(
+            update(RefreshToken)
+            .where(RefreshToken.user_id == user_id, RefreshToken.revoked_at.is_(None))
+            .values(revoked_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
+
+    async def issue(self, user_id: int) -> str:
+        """A new refresh token for the user"""
+        async def issue_token(session: AsyncSession):
+            # Stored timestamps are naive UTC
+            now = datetime.now(UTC).replace(tzinfo=None)
+            # Expired tokens can't be used or reused, drop them while the user's rows are being written anyway
+            await session.execute(delete(RefreshToken).where(RefreshToken.user_id == user_id,
+                                                             RefreshToken.expires_at <= now))
+            return self._add(session, user_id, now)
+        return await db_writer.run(issue_token)
+
+    async def rotate(self, token: str) -> Tuple[User, str]:
+        """Exchange a refresh token for its user and a new token, raising 401 if it can't be used"""
+        async def rotate_token(session: AsyncSession) -> Tuple[Optional[User], Optional[str]]:
+            now = datetime.now(UTC).replace(tzinfo=None)
+            stored = await session.scalar(select(RefreshToken).where(RefreshToken.token_hash == hash_refresh_token(token)))
+            if stored is None or stored.expires_at <= now:
+                return None, None
+            if stored.revoked_at is not None:
+                await self._revoke_all(session, stored.user_id, now)
+                return None, None
+            user = await session.get(User, stored.user_id)
+            if user is None or not user.is_active:
+                return None, None
+            stored.revoked_at = now
+            return user, self._add(session, user.id, now)
+
+        # Returned rather than raised, so revoking after a reuse is still committed
+        user, new_token = await db_writer.run(rotate_token)
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid refresh token",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        return user, new_token
+
+    async def revoke_user(self, user_id: int) -> int:
+        """Revoke every refresh token the user holds, returning how many there were"""
+        async def revoke(session: AsyncSession):
+            return await self._revoke_all(session, user_id, datetime.now(UTC).replace(tzinfo=None))
+        return await db_writer.run(revoke)
+
+# Global refresh token store instance
+refresh_tokens = RefreshTokenStore(settings.REFRESH_TOKEN_EXPIRE_DAYS)
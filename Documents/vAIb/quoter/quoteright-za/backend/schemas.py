@@ -29,6 +29,16 @@ class User(UserBase):
 class Token(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: Optional[str] = None
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+class Usage(BaseModel):
+    resource: str
+    used: int
+    limit: Optional[int] = None  # None when the tier is unlimited
+    resets_at: Optional[datetime] = None
 
 # Client schemas
 class ClientBase(BaseModel):
@@ -49,6 +59,10 @@ class Client(ClientBase):
     class Config:
         from_attributes = True
 
+class ClientPage(BaseModel):
+    items: List[Client]
+    next_cursor: Optional[str] = None
+
 # Quote schemas
 class QuoteFeatures(BaseModel):
     industry: str
@@ -94,12 +108,70 @@ class QuoteResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class QuotePage(BaseModel):
+    items: List[QuoteResponse]
+    next_cursor: Optional[str] = None
+
+class QuoteSummary(BaseModel):
+    """QuoteResponse without the quote_data blob and pdf_url, for list views"""
+    id: int
+    user_id: int
+    client_id: Optional[int]
+    industry: str
+    job_title: str
+    location: str
+    status: str
+    final_price: float
+    created_at: datetime
+    expires_at: Optional[datetime]
+    
+    class Config:
+        from_attributes = True
+
+class QuoteSummaryPage(BaseModel):
+    items: List[QuoteSummary]
+    next_cursor: Optional[str] = None
+
+class QuoteDocument(BaseModel):
+    quote_id: int
+    status: str  # pending, ready, failed
+    pdf_url: Optional[str] = None
+    error: Optional[str] = None
+
 class PricingRecommendation(BaseModel):
     min_price: float
     max_price: float
     confidence: float
     rationale: str
 
+# Analytics schemas
+class ItemRevenue(BaseModel):
+    description: Optional[str]
+    quotes: int
+    quantity: float
+    revenue: float
+    average_unit_price: float
+    
+    class Config:
+        from_attributes = True
+
+class IndustryPricing(BaseModel):
+    industry: Optional[str]
+    items: int
+    average_unit_price: float
+    revenue: float
+    
+    class Config:
+        from_attributes = True
+
+class QuoteTotals(BaseModel):
+    total_quotes: int
+    total_value: float
+    accepted_quotes: int
+    
+    class Config:
+        from_attributes = True
+
 # AI Model schemas
 class TrainingData(BaseModel):
     industry: str
@@ -109,6 +181,15 @@ class TrainingData(BaseModel):
     duration_hours: float
     final_price: float
 
+class TrainingJob(BaseModel):
+    job_id: str
+    status: str  # queued, running, completed, failed
+    samples: int
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
+
 # Response schemas
 class SuccessResponse(BaseModel):
     message: str
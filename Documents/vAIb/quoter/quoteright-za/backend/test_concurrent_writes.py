@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Concurrent quota reads and quote writes from many users at once
+
+Each user asks for a prediction and their usage while creating quotes, all
+at the same time. None of it may fail, and every user's usage counter has to
+match the quotes they have stored.
+"""
+
+import asyncio
+import atexit
+import os
+import shutil
+import tempfile
+
+# Keep the test database away from the real one
+WORK_DIR = tempfile.mkdtemp()
+# Removed at exit, the first test module imported decides the database every test in the run uses
+atexit.register(shutil.rmtree, WORK_DIR, ignore_errors=True)
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(WORK_DIR, 'test.db')}"
+os.environ["MODEL_WARMUP"] = "false"
+os.environ["BCRYPT_ROUNDS"] = "4"
+
+import httpx
+from sqlalchemy import func, select
+
+import main as api
+from database import AsyncSessionLocal, Quote, User
+
+USERS = 40
+QUOTES_PER_USER = 3
+
+FEATURES = {"industry": "plumbing", "location": "gauteng", "experience_level": "intermediate",
+            "duration_hours": 3, "job_title": "Geyser replacement"}
+
+async def user_session(client, n: int):
+    """Statuses of one user's predict, usage and quote requests, sent together"""
+    token = (await client.post("/auth/register", json={
+        "email": f"user{n}@example.com", "password": "password", "business_name": f"Business {n}",
+        "industry": "plumbing", "experience_level": "intermediate"})).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    responses = await asyncio.gather(
+        client.post("/ai/predict", json=FEATURES, headers=headers),
+        client.get("/auth/usage", headers=headers),
+        *(client.post("/quotes", json={"features": FEATURES, "items": []}, headers=headers)
+          for _ in range(QUOTES_PER_USER)),
+    )
+    return [(response.request.url.path, response.status_code, response.text) for response in responses]
+
+async def run_users():
+    # Errors come back as 500s to be counted, rather than being raised here
+    transport = httpx.ASGITransport(app=api.app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        results = await asyncio.gather(*(user_session(client, n) for n in range(USERS)))
+
+        failures = [result for session in results for result in session if result[1] >= 500]
+        assert not failures, f"{len(failures)} requests failed, first: {failures[0]}"
+
+        # Each counter matches the quotes its user actually has
+        async with AsyncSessionLocal() as db:
+            stored = dict((await db.execute(
+                select(User.email, func.count(Quote.id)).outerjoin(Quote, Quote.user_id == User.id).group_by(User.email)
+            )).all())
+        for n in range(USERS):
+            login = await client.post("/auth/login", json={"email": f"user{n}@example.com", "password": "password"})
+            headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+            usage = (await client.get("/auth/usage", headers=headers)).json()
+            used = next(entry["used"] for entry in usage if entry["resource"] == "quotes")
+            assert used == stored[f"user{n}@example.com"], f"user{n}: counter {used}, quotes {stored[f'user{n}@example.com']}"
+    await api.db_writer.close()
+
+def test_concurrent_quota_reads_and_quote_writes():
+    # Only the database side is under test, documents aren't rendered
+    submit = api.document_jobs.submit
+    api.document_jobs.submit = lambda *args, **kwargs: {}
+    try:
+        asyncio.run(run_users())
+    finally:
+        api.document_jobs.submit = submit
+
+if __name__ == "__main__":
+    test_concurrent_quota_reads_and_quote_writes()
+    print(f"✅ {USERS} users predicting, reading usage and creating quotes at once")
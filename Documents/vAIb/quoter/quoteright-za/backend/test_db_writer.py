@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+A request cancelled while its unit of work is running, with that unit then
+failing, must not take the rest of its write batch down with it
+"""
+
+import asyncio
+import atexit
+import os
+import shutil
+import tempfile
+
+# Keep the test database away from the real one
+WORK_DIR = tempfile.mkdtemp()
+# Removed at exit, the first test module imported decides the database every test in the run uses
+atexit.register(shutil.rmtree, WORK_DIR, ignore_errors=True)
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(WORK_DIR, 'test.db')}"
+# Settings are read once per run, so the same test settings as test_concurrent_writes whichever imports first
+os.environ["MODEL_WARMUP"] = "false"
+os.environ["BCRYPT_ROUNDS"] = "4"
+
+from sqlalchemy import select
+
+from database import User, WriterSessionLocal, writer_engine
+from db_writer import DatabaseWriter
+
+def new_user(email: str) -> User:
+    return User(email=email, hashed_password="test_hash", business_name="Test Business",
+                industry="plumbing", experience_level="intermediate")
+
+async def run_batch():
+    writer = DatabaseWriter(WriterSessionLocal)
+    started, release = asyncio.Event(), asyncio.Event()
+
+    async def failing(session):
+        started.set()
+        await release.wait()
+        raise ValueError("unit failed")
+
+    # All three are queued before the writer runs, so they share one batch
+    before = asyncio.create_task(writer.add(new_user("before@writer.example.com")))
+    cancelled = asyncio.create_task(writer.run(failing))
+    after = asyncio.create_task(writer.add(new_user("after@writer.example.com")))
+
+    await started.wait()
+    cancelled.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    await asyncio.gather(before, after)
+    assert cancelled.cancelled()
+    assert writer.batches == 1, f"{writer.batches} batches"
+
+    async def emails(session):
+        return set(await session.scalars(select(User.email).where(User.email.like("%@writer.example.com"))))
+    stored = await writer.run(emails)
+    assert stored == {"before@writer.example.com", "after@writer.example.com"}, stored
+    await writer.close()
+    await writer_engine.dispose()
+
+def test_cancelled_failing_unit_keeps_batch():
+    asyncio.run(run_batch())
+
+if __name__ == "__main__":
+    test_cancelled_failing_unit_keeps_batch()
+    print("✅ Cancelled failing unit left the rest of its batch committed")
@@ -0,0 +1,101 @@
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, UTC
+from typing import Dict, List, Optional
+
+from config import settings
+
+class TrainingJobQueue:
+    """Background model training with an atomic hot-swap into pricing_model
+
+    Jobs run one at a time in submission order. Each fit happens in a worker
+    process so the API's event loop and GIL stay free; only once it completes is
+    the new (model, encoders) pair swapped into the global pricing_model and saved.
+    """
+
+    def __init__(self, max_jobs: int = 100):
+        self.max_jobs = max_jobs
+        self._jobs: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._dispatcher = None
+        self._process_pool = None
+
+    def _executors(self):
+        with self._lock:
+            if self._dispatcher is None:
+                self._dispatcher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="training-dispatch")
+                self._process_pool = ProcessPoolExecutor(max_workers=1)
+            return self._dispatcher, self._process_pool
+
+    def submit(self, training_data: List[Dict]) -> Dict:
+        """Queue a training run and return its job record"""
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "status": "queued",
+            "samples": len(training_data),
+            "created_at": datetime.now(UTC),
+            "started_at": None,
+            "finished_at": None,
+            "error": None,
+        }
+        with self._lock:
+            self._jobs[job["job_id"]] = job
+            self._trim()
+
+        dispatcher, _ = self._executors()
+        dispatcher.submit(self._run, job["job_id"], training_data)
+        return dict(job)
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def _update(self, job_id: str, **fields):
+        with self._lock:
+            if job_id in self._jobs:
+                self._jobs[job_id].update(fields)
+
+    def _trim(self):
+        """Forget the oldest finished jobs beyond max_jobs"""
+        for job_id in list(self._jobs):
+            if len(self._jobs) <= self.max_jobs:
+                break
+            if self._jobs[job_id]["status"] in ("completed", "failed"):
+                del self._jobs[job_id]
+
+    def _run(self, job_id: str, training_data: List[Dict]):
+        from ai_model import fit_pricing_model, pricing_model
+        
+        self._update(job_id, status="running", started_at=datetime.now(UTC))
+        try:
+            # The current fit is read when the job starts so queued jobs build on each other.
+            # The forest itself is only shipped to the worker when it will be extended.
+            _, process_pool = self._executors()
+            model, label_encoders = pricing_model.fitted
+            if not settings.MODEL_WARM_START:
+                model = None
+            model, label_encoders = process_pool.submit(
+                fit_pricing_model, training_data, model, label_encoders
+            ).result()
+            pricing_model.swap_model(model, label_encoders)
+            pricing_model.save_model()
+        except Exception as e:
+            self._update(job_id, status="failed", error=str(e), finished_at=datetime.now(UTC))
+            print(f"Training job {job_id} failed: {e}")
+            return
+        self._update(job_id, status="completed", finished_at=datetime.now(UTC))
+        print(f"Training job {job_id} completed, model swapped in")
+
+    def shutdown(self):
+        with self._lock:
+            dispatcher, process_pool = self._dispatcher, self._process_pool
+            self._dispatcher = self._process_pool = None
+        if dispatcher is not None:
+            dispatcher.shutdown(wait=True)
+            process_pool.shutdown(wait=True)
+
+# Global training job queue
+training_jobs = TrainingJobQueue()
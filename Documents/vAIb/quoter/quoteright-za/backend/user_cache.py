@@ -0,0 +1,118 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached, object_session
+
+from config import settings
+from database import User
+from pubsub import pubsub
+
+INVALIDATION_CHANNEL = "user-cache-invalidate"
+
+class UserCache:
+    """Bounded LRU of user records by token subject, each kept for at most ttl seconds
+
+    Entries hold the user's column values rather than the ORM object, which
+    belongs to the session that loaded it. get() builds a fresh User from them
+    on every hit, detached as if loaded and then closed, so requests never
+    share an instance and session.add() or merge() treat it as the stored
+    row. It has no session, so relationships such as user.quotes must be
+    queried instead.
+
+    Invalidations are published on bus, so every cache subscribed to the same
+    channel (one per worker process with a shared broker) drops the user too.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float = 60.0, bus=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.bus = bus
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._origin = uuid.uuid4().hex
+        self.hits = self.misses = self.evictions = self.expirations = self.invalidations = 0
+        if bus is not None:
+            bus.subscribe(INVALIDATION_CHANNEL, self._on_invalidation)
+
+    def get(self, subject: str) -> Optional[User]:
+        with self._lock:
+            entry = self._entries.get(subject)
+            if entry is not None and entry[0] <= time.monotonic():
+                del self._entries[subject]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(subject)
+            self.hits += 1
+        # Detached with its identity key, so adding it to a session updates the stored user rather than inserting one
+        user = User(**entry[1])
+        make_transient_to_detached(user)
+        return user
+
+    def put(self, subject: str, user: User):
+        values = {attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs}
+        with self._lock:
+            self._entries[subject] = (time.monotonic() + self.ttl, values)
+            self._entries.move_to_end(subject)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _drop(self, subject: str):
+        with self._lock:
+            if self._entries.pop(subject, None) is not None:
+                self.invalidations += 1
+
+    def invalidate(self, subject: str):
+        """Drop subject here and in every cache listening on the bus"""
+        self._drop(subject)
+        if self.bus is not None:
+            self.bus.publish(INVALIDATION_CHANNEL, {"origin": self._origin, "subject": subject})
+
+    def _on_invalidation(self, message: Dict):
+        if message["origin"] != self._origin:
+            self._drop(message["subject"])
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            size = len(self._entries)
+        lookups = self.hits + self.misses
+        return {
+            "size": size,
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+# Global user cache instance
+user_cache = UserCache(settings.USER_CACHE_SIZE, settings.USER_CACHE_TTL, pubsub)
+
+# Users changed through the ORM are dropped from the cache once the change is
+# committed, under their old email too if it changed. Bulk query.update() calls
+# skip these events and must call user_cache.invalidate() themselves.
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _queue_invalidation(mapper, connection, target):
+    session = object_session(target)
+    subjects = session.info.setdefault("invalidate_users", set())
+    subjects.add(target.email)
+    subjects.update(inspect(target).attrs.email.history.deleted)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session):
+    for subject in session.info.pop("invalidate_users", ()):
+        user_cache.invalidate(subject)
@@ -12,6 +12,12 @@ interface Quote {
   client_id?: number;
 }
 
+interface QuoteTotals {
+  total_quotes: number;
+  total_value: number;
+  accepted_quotes: number;
+}
+
 interface User {
   id: number;
   email: string;
@@ -24,6 +30,7 @@ interface User {
 const Dashboard: React.FC = () => {
   const [user, setUser] = useState<User | null>(null);
   const [quotes, setQuotes] = useState<Quote[]>([]);
+  const [totals, setTotals] = useState<QuoteTotals | null>(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
   const navigate = useNavigate();
@@ -37,6 +44,7 @@ const Dashboard: React.FC = () => {
 
     fetchUserData();
     fetchQuotes();
+    fetchTotals();
   }, [navigate]);
 
   const fetchUserData = async () => {
@@ -63,15 +71,16 @@ const Dashboard: React.FC = () => {
   const fetchQuotes = async () => {
     try {
       const token = localStorage.getItem('token');
-      const response = await fetch('http://localhost:8000/quotes', {
+      // Only the most recent quotes are listed, the stats come from /analytics/summary
+      const response = await fetch('http://localhost:8000/quotes?view=summary&limit=6', {
         headers: {
           'Authorization': `Bearer ${token}`
         }
       });
 
       if (response.ok) {
-        const quotesData = await response.json();
-        setQuotes(quotesData);
+        const quotesPage = await response.json();
+        setQuotes(quotesPage.items);
       }
     } catch (err) {
       setError('Failed to load quotes');
@@ -80,6 +89,23 @@ const Dashboard: React.FC = () => {
     }
   };
 
+  const fetchTotals = async () => {
+    try {
+      const token = localStorage.getItem('token');
+      const response = await fetch('http://localhost:8000/analytics/summary', {
+        headers: {
+          'Authorization': `Bearer ${token}`
+        }
+      });
+
+      if (response.ok) {
+        setTotals(await response.json());
+      }
+    } catch (err) {
+      setError('Failed to load quote totals');
+    }
+  };
+
   const handleLogout = () => {
     localStorage.removeItem('token');
     navigate('/login');
@@ -99,9 +125,10 @@ const Dashboard: React.FC = () => {
     return new Date(dateString).toLocaleDateString();
   };
 
-  const totalQuotes = quotes.length;
-  const totalValue = quotes.reduce((sum, quote) => sum + quote.final_price, 0);
-  const acceptedQuotes = quotes.filter(quote => quote.status === 'accepted').length;
+  // Across all of the user's quotes, not just the page listed below
+  const totalQuotes = totals?.total_quotes ?? 0;
+  const totalValue = totals?.total_value ?? 0;
+  const acceptedQuotes = totals?.accepted_quotes ?? 0;
 
   if (loading) {
     return (